@@ -0,0 +1,89 @@
+"""Load test for chat_server: scripted conversations over keep-alive HTTP.
+
+Starts the server in a background thread, then runs CONVERSATIONS scripted
+conversations at each concurrency level (one keep-alive connection per client)
+and reports requests/s and p50/p99 request latency.
+
+Run from the repository root:  python Scripts/benchmarks/bench_chat_server.py
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import chat_server  # noqa: E402
+
+SCRIPT = ["4", "a few weeks", "low mood and trouble sleeping", "India", "yes", "yes", "exit"]
+CONCURRENCY = [1, 8, 32, 128]
+CONVERSATIONS = 256
+
+
+def start_server():
+    started = threading.Event()
+    holder = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        holder["server"] = loop.run_until_complete(chat_server.ChatServer(port=0).start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return holder["server"]
+
+
+async def post(reader, writer, port, path, data):
+    body = json.dumps(data).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    return json.loads(await reader.readexactly(length))
+
+
+async def client(port, conversations, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(conversations):
+        session_id = (await post(reader, writer, port, "/api/session", {}))["session_id"]
+        for message in SCRIPT:
+            start = time.perf_counter()
+            await post(reader, writer, port, "/api/chat", {"session_id": session_id, "message": message})
+            latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def run_level(port, concurrency):
+    latencies = []
+    per_client = max(1, CONVERSATIONS // concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, per_client, latencies) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / elapsed, statistics.median(latencies), p99
+
+
+def main():
+    # DATASET_FILES are relative to the working directory ("../processed_data/...")
+    os.chdir(os.path.join(DATA_DIR, "processed_data"))
+    server = start_server()
+    print(f"{'clients':>8}{'req/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for concurrency in CONCURRENCY:
+        rps, p50, p99 = asyncio.run(run_level(server.port, concurrency))
+        print(f"{concurrency:>8}{rps:>12,.0f}{p50 * 1000:>10.2f}{p99 * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
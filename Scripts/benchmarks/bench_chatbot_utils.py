@@ -0,0 +1,64 @@
+"""Throughput of the chatbot_utils getters: boolean-mask scans vs. the entity index.
+
+The survey files chatbot_utils.load_datasets() expects are not shipped in Data/,
+so the benchmark feeds the getters the processed survey tables that are, which
+have the same Entity/Year/value layout.
+
+Run from the repository root:  python Scripts/benchmarks/bench_chatbot_utils.py
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import chatbot_utils  # noqa: E402
+
+STAND_INS = {
+    "comfort_speaking": ("processed_data/dealing_anxiety.csv", chatbot_utils.get_comfort_stats),
+    "mental_health_policy": ("processed_data/dealt_anxiety.csv", chatbot_utils.get_policy_status),
+    "gov_funding_support": ("processed_data/dealt_anxiety.csv", chatbot_utils.get_research_support),
+    "lifetime_anxiety_depression": ("processed_data/filled_form.csv", chatbot_utils.get_lifetime_disorder_prevalence),
+    "psychiatrists_per_country": ("processed_data/dealing_anxiety.csv", chatbot_utils.get_psychiatrist_density),
+}
+
+
+def scan_lookup(country, df):
+    """The pre-index lookup: lowercase and boolean-mask the whole frame"""
+    country = country.lower()
+    row = df[df["Entity"] == country]
+    if not row.empty:
+        return row.iloc[0, -1]
+    return None
+
+
+def run(fn, table, countries, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for country in countries:
+            fn(country, table)
+    elapsed = time.perf_counter() - start
+    return repeat * len(countries) / elapsed
+
+
+def main(repeat=20):
+    raw = {name: pd.read_csv(os.path.join(DATA_DIR, path)) for name, (path, _) in STAND_INS.items()}
+    start = time.perf_counter()
+    indexed = chatbot_utils.index_datasets(raw)
+    print(f"index build: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    print(f"{'dataset':<30}{'scan/s':>14}{'indexed/s':>14}{'speedup':>10}")
+    for name, (_, getter) in STAND_INS.items():
+        df = indexed[name].frame
+        countries = [entity.title() for entity in df["Entity"].unique()]
+        before = run(scan_lookup, df, countries, repeat)
+        after = run(getter, indexed[name], countries, repeat)
+        print(f"{name:<30}{before:>14,.0f}{after:>14,.0f}{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
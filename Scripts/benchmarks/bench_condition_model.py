@@ -0,0 +1,89 @@
+"""Latency of the persisted condition model vs. the fitted scikit-learn estimators.
+
+Trains once (as run_pipeline does on every run), saves the artifact to a
+temporary directory and reports:
+
+  train       fitting scaler + forest + logistic regression for every condition
+  load        check_sync + memory-mapped load of the saved arrays
+  single      predict_one for one country, vs. scaler + predict_proba per condition
+  batch       every country x year row of all.csv in one call, per row
+  traversal   the flattened-forest walk used for fractional years, per row
+
+Probabilities from the forest table, the flattened forests and the logistic
+models are checked against the scikit-learn estimators before anything is
+timed.
+
+Run from the repository root:  python Scripts/benchmarks/bench_condition_model.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import condition_model  # noqa: E402
+
+
+def per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    start = time.perf_counter()
+    manifest, arrays, estimators = condition_model.train_model()
+    train_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        condition_model.save_model(manifest, arrays, model_dir)
+        start = time.perf_counter()
+        model = condition_model.load_model(model_dir, rebuild=False)
+        load_time = time.perf_counter() - start
+
+        df = pd.read_csv(condition_model.TRAINING_PATH)
+        countries, years = df["Entity"].tolist(), df["Year"].to_numpy()
+        X_scaled = model.scale(model.features(countries, years))
+        sample = np.random.default_rng(0).choice(len(df), 200, replace=False)
+        start = time.perf_counter()
+        walked = model.forest_proba(X_scaled[sample])
+        traversal = (time.perf_counter() - start) / len(sample)
+        table = model.forest_lookup(countries, years)
+        logistic = model.logistic_proba(X_scaled)
+        for j, condition in enumerate(model.conditions):
+            forest = estimators[condition]["random_forest"].predict_proba(X_scaled)[:, 1]
+            assert np.allclose(table[:, j], forest), condition
+            assert np.allclose(walked[:, j], forest[sample]), condition
+            expected = estimators[condition]["logistic_regression"].predict_proba(X_scaled)[:, 1]
+            assert np.allclose(logistic[:, j], expected), condition
+
+        def sklearn_one():
+            row = model.scale(model.features(["India"], [model.latest_year]))
+            return {c: estimators[c][manifest["best_model"][c]].predict_proba(row)[0, 1] for c in model.conditions}
+
+        single = per_call(lambda: model.predict_one("India"), 200)
+        single_sklearn = per_call(sklearn_one, 20)
+
+        start = time.perf_counter()
+        model.predict_proba(countries, years)
+        batch = (time.perf_counter() - start) / len(countries)
+        start = time.perf_counter()
+        for c in model.conditions:
+            estimators[c][manifest["best_model"][c]].predict_proba(X_scaled)
+        batch_sklearn = (time.perf_counter() - start) / len(countries)
+
+    print(f"{'train':<8} {train_time:8.2f} s")
+    print(f"{'load':<8} {load_time * 1e3:8.2f} ms  (sync check + mmap)")
+    print(f"{'single':<8} {single * 1e3:8.3f} ms   sklearn {single_sklearn * 1e3:8.3f} ms   x{single_sklearn / single:.1f}")
+    print(f"{'batch':<8} {batch * 1e6:8.2f} us/row  sklearn {batch_sklearn * 1e6:8.2f} us/row  ({len(countries)} rows)")
+    print(f"{'traversal':<8} {traversal * 1e6:8.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
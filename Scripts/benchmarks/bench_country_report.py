@@ -0,0 +1,62 @@
+"""All-country report: one getter call per country per metric vs. country_reports().
+
+report_frame is the single outer join of the five tables; country_reports
+reuses its records while the same tables stay loaded.
+
+Uses the processed survey tables that bench_chatbot_utils.py substitutes for
+the files chatbot_utils.load_datasets() expects, and checks that the batch
+records carry the same numbers the getters format.
+
+Run from the repository root:  python Scripts/benchmarks/bench_country_report.py
+"""
+import io
+import os
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import chatbot_utils  # noqa: E402
+from bench_chatbot_utils import STAND_INS  # noqa: E402
+
+
+def per_country(data, countries):
+    return [[getter(country, data[name]) for name, (_, getter) in STAND_INS.items()] for country in countries]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main(repeat=20):
+    data = {name: chatbot_utils.load_indexed_csv(os.path.join(DATA_DIR, path), chatbot_utils.SCHEMAS[name]) for name, (path, _) in STAND_INS.items()}
+    records = chatbot_utils.country_reports(data)
+    countries = [record["country"] for record in records]
+
+    strings, getters = timed(lambda: per_country(data, countries), repeat)
+    _, merge = timed(lambda: chatbot_utils.report_frame(data), repeat)
+    _, batch = timed(lambda: chatbot_utils.country_reports(data), repeat)
+    _, jsonl = timed(lambda: chatbot_utils.write_reports(chatbot_utils.country_reports(data), io.StringIO()), repeat)
+    _, csv = timed(lambda: chatbot_utils.write_reports(chatbot_utils.country_reports(data), io.StringIO(), "csv"), repeat)
+
+    for record, answers in zip(records, strings):
+        if record["research_support"] is not None:
+            assert f"{record['research_support']:.1f}%" in answers[2], record["country"]
+        if record["lifetime_prevalence"] is not None:
+            assert f"{record['lifetime_prevalence']:.1f}%" in answers[3], record["country"]
+
+    print(f"{len(countries)} countries x {len(STAND_INS)} metrics")
+    print(f"{'getters, per country':<24} {getters * 1e3:8.2f} ms")
+    print(f"{'report_frame (merge)':<24} {merge * 1e3:8.2f} ms")
+    print(f"{'country_reports':<24} {batch * 1e3:8.2f} ms   x{getters / batch:.1f}   (records kept until a table reloads)")
+    print(f"{'  + JSON Lines':<24} {jsonl * 1e3:8.2f} ms")
+    print(f"{'  + CSV':<24} {csv * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
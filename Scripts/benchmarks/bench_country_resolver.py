@@ -0,0 +1,70 @@
+"""Latency of country name resolution over every Entity in Data/.
+
+Builds one CountryResolver from all CSVs, checks a few aliases, codes and typos,
+then times cached lookups and uncached exact, alias and fuzzy lookups.
+
+Run from the repository root:  python Scripts/benchmarks/bench_country_resolver.py
+"""
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from country_resolver import CountryResolver  # noqa: E402
+
+EXPECTED = {
+    "USA": "United States",
+    "uk": "United Kingdom",
+    "india ": "India",
+    "IND": "India",
+    "Untied States": "United States",
+    "germny": "Germany",
+    "ivory coast": "Cote d'Ivoire",
+    "The Netherlands": "Netherlands",
+    "narnia": None
+}
+
+
+def timed(resolver, names, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name in names:
+            resolver.resolve(name)
+    return (time.perf_counter() - start) / (repeat * len(names))
+
+
+def main():
+    paths = glob.glob(os.path.join(DATA_DIR, "*.csv")) + glob.glob(os.path.join(DATA_DIR, "processed_data", "*.csv"))
+    frames = [pd.read_csv(path) for path in paths]
+
+    start = time.perf_counter()
+    resolver = CountryResolver()
+    for df in frames:
+        resolver.add_frame(df)
+    print(f"index build {(time.perf_counter() - start) * 1000:.1f} ms  {resolver.stats()}")
+
+    for name, entity in EXPECTED.items():
+        assert resolver.resolve(name) == entity, (name, resolver.resolve(name))
+
+    entities = list(resolver.canonical.values())
+    cases = {
+        "exact": [e.upper() for e in entities],
+        "alias": ["usa", "u.k.", "burma", "czech republic", "holland"],
+        "typo": ["Untied States", "Inida", "germny", "Frnace", "south korae"]
+    }
+    for label, names in cases.items():
+        uncached = CountryResolver(cache_size=0)
+        for df in frames:
+            uncached.add_frame(df)
+        print(f"{label:<6} uncached {timed(uncached, names, 20) * 1e6:8.2f} us   "
+              f"cached {timed(resolver, names, 2000) * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
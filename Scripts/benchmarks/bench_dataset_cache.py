@@ -0,0 +1,46 @@
+"""Startup cost of loading the Data/ CSVs: pd.read_csv vs. the columnar cache.
+
+Builds (or refreshes) the caches first, then times each file both ways. Files
+below dataset_cache.MIN_CACHE_BYTES are always read as CSV, so only the cached
+files are listed.
+
+Run from the repository root:  python Scripts/benchmarks/bench_dataset_cache.py
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import dataset_cache  # noqa: E402
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(repeat=5):
+    paths = dataset_cache.build_all(DATA_DIR)
+    total_csv = total_cache = 0.0
+    print(f"{'file':<60}{'csv ms':>10}{'cache ms':>10}{'speedup':>10}")
+    for path in paths:
+        csv_time = best_of(lambda: pd.read_csv(path), repeat)
+        cache_time = best_of(lambda: dataset_cache.read_csv_cached(path, rebuild=False), repeat)
+        total_csv += csv_time
+        total_cache += cache_time
+        name = os.path.relpath(path, DATA_DIR)
+        print(f"{name[:58]:<60}{csv_time * 1000:>10.2f}{cache_time * 1000:>10.2f}{csv_time / cache_time:>9.1f}x")
+    print(f"{'total':<60}{total_csv * 1000:>10.2f}{total_cache * 1000:>10.2f}{total_csv / total_cache:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Wall time of the figure build: serial vs. process pool vs. nothing changed.
+
+Renders every figure into a temporary directory with 1 worker and with one
+worker per CPU (both forced), then reruns with nothing changed, where every
+figure should be skipped on its hash.
+
+Run from the repository root:  python Scripts/benchmarks/bench_figures.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import figures  # noqa: E402
+
+
+def timed_build(output_dir, **kwargs):
+    start = time.perf_counter()
+    results = figures.build_figures(output_dir, **kwargs)
+    return results, time.perf_counter() - start
+
+
+def main():
+    jobs = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        serial, serial_time = timed_build(tmp, jobs=1, force=True)
+        _, parallel_time = timed_build(tmp, jobs=jobs, force=True)
+        cached, cached_time = timed_build(tmp, jobs=jobs)
+        assert all(r["status"] == "unchanged" for r in cached)
+
+    figures.print_report(serial, serial_time)
+    print()
+    for label, seconds in [("serial (1 worker)", serial_time), (f"pool ({jobs} workers)", parallel_time),
+                           ("unchanged", cached_time)]:
+        print(f"{label:<22}{seconds:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Overhead of the instrumentation layer on a full conversation.
+
+Runs the same scripted six-turn conversations through respond() three ways:
+
+  bare       the undecorated step handlers and accessors (metrics.py not in the path)
+  disabled   the instrumented code with metrics off (the default)
+  enabled    metrics on, every timer and counter recording
+
+Run from the repository root:  python Scripts/benchmarks/bench_metrics.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import mental_health_assistant as assistant  # noqa: E402
+import metrics  # noqa: E402
+
+SCRIPT = ["3", "weeks", "I feel anxious and worry a lot", "usa", "yes", "yes"]
+INSTRUMENTED = [
+    "load_csv", "get_country_data", "get_prevalence_aggregates", "get_global_averages",
+    "get_mental_health_resources", "resolve_country", "respond"
+]
+
+
+def run(conversations=3000):
+    start = time.perf_counter()
+    for _ in range(conversations):
+        session = assistant.Session()
+        for message in SCRIPT:
+            assistant.respond(message, session)
+    return (time.perf_counter() - start) / (conversations * len(SCRIPT))
+
+
+@contextlib.contextmanager
+def unwrapped():
+    """Temporarily swap the decorated functions for the originals"""
+    saved = {name: getattr(assistant, name) for name in INSTRUMENTED}
+    handlers = assistant.STEP_HANDLERS
+    for name, fn in saved.items():
+        setattr(assistant, name, fn.__wrapped__)
+    assistant.STEP_HANDLERS = tuple(h.__wrapped__ for h in handlers)
+    try:
+        yield
+    finally:
+        for name, fn in saved.items():
+            setattr(assistant, name, fn)
+        assistant.STEP_HANDLERS = handlers
+
+
+def main():
+    os.chdir(os.path.join(DATA_DIR, "processed_data"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        assistant.load_all_datasets()
+    run(10)  # load tables and build caches outside the timings
+
+    metrics.disable()
+    with unwrapped():
+        bare = run()
+    disabled = run()
+    metrics.enable()
+    enabled = run()
+    metrics.disable()
+
+    print(f"{'bare':<10} {bare * 1e6:8.2f} us/turn")
+    print(f"{'disabled':<10} {disabled * 1e6:8.2f} us/turn   +{(disabled - bare) * 1e9:7.0f} ns")
+    print(f"{'enabled':<10} {enabled * 1e6:8.2f} us/turn   +{(enabled - bare) * 1e9:7.0f} ns")
+    print()
+    print(metrics.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Per-turn cost of the learn-more and resources answers.
+
+Times handle_learn_more_input and handle_resources_input with the renderer's
+memo cleared before every turn (render on each call) and with it warm (the
+steady state once a country/condition has been asked about).
+
+Run from the repository root:  python Scripts/benchmarks/bench_responses.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import mental_health_assistant as assistant  # noqa: E402
+
+COUNTRIES = ["India", "United States", "United Kingdom", "Germany", "Brazil", "Narnia"]
+CONDITIONS = ["depression", "anxiety", "mental health challenges"]
+
+
+def sessions():
+    result = []
+    for country in COUNTRIES:
+        for condition in CONDITIONS:
+            session = assistant.Session()
+            session.country = country
+            session.condition = condition
+            result.append(session)
+    return result
+
+
+def timed(handler, cold, repeat=2000):
+    batch = sessions()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for session in batch:
+            if cold:
+                assistant.renderer.clear()
+            handler(session, "yes")
+    return (time.perf_counter() - start) / (repeat * len(batch))
+
+
+def main():
+    os.chdir(os.path.join(DATA_DIR, "processed_data"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        assistant.load_all_datasets()
+    assistant.get_country_data("India")  # load tables and build the resolver outside the timings
+
+    for handler in (assistant.handle_learn_more_input, assistant.handle_resources_input):
+        cold = timed(handler, cold=True)
+        warm = timed(handler, cold=False)
+        print(f"{handler.__name__:<26} rendered {cold * 1e6:8.2f} us   memoized {warm * 1e6:8.2f} us   x{cold / warm:.1f}")
+    print(assistant.renderer.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Peak memory and time of the streaming narrow-dtype loader vs. pd.read_csv.
+
+Data/all.csv is tiled (entity names suffixed per copy) into a larger IHME-style
+extract in a temporary directory, then read three ways:
+
+  read_csv            full table, default dtypes
+  read_csv_narrow     projected to two value columns, float32/categorical/int16
+  stream_aggregates   per-entity statistics only, never holding the table
+
+Peak traced allocations are reported for each, and the streamed aggregates
+are checked against a pandas groupby over the full table.
+
+Run from the repository root:  python Scripts/benchmarks/bench_stream_loader.py [copies]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from stream_loader import read_csv_narrow, stream_aggregates  # noqa: E402
+from trends import ALL_CSV_CONDITIONS  # noqa: E402
+
+COLUMNS = list(ALL_CSV_CONDITIONS)[1:3]  # depression, anxiety
+
+
+def write_extract(path, copies):
+    base = pd.read_csv(os.path.join(DATA_DIR, "all.csv"))
+    with open(path, "w") as f:
+        for i in range(copies):
+            tile = base.copy()
+            tile["Entity"] = tile["Entity"] + f" #{i}"
+            tile.to_csv(f, index=False, header=(i == 0))
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(copies=40):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "extract.csv")
+        write_extract(path, copies)
+        print(f"extract: {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        full, full_time, full_peak = measure(lambda: pd.read_csv(path))
+        narrow, narrow_time, narrow_peak = measure(lambda: read_csv_narrow(path, COLUMNS))
+        aggregates, stream_time, stream_peak = measure(lambda: stream_aggregates(path, COLUMNS, chunksize=50_000))
+
+        expected = full.groupby("Entity")[COLUMNS].mean()
+        assert np.allclose(aggregates["mean"].to_numpy(), expected.to_numpy(), rtol=1e-5, equal_nan=True)
+        assert len(narrow) == len(full)
+
+        print(f"{'read_csv':<20} {full_time:6.2f} s  peak {full_peak / 2**20:7.1f} MiB  "
+              f"frame {full.memory_usage(deep=True).sum() / 2**20:7.1f} MiB")
+        print(f"{'read_csv_narrow':<20} {narrow_time:6.2f} s  peak {narrow_peak / 2**20:7.1f} MiB  "
+              f"frame {narrow.memory_usage(deep=True).sum() / 2**20:7.1f} MiB")
+        print(f"{'stream_aggregates':<20} {stream_time:6.2f} s  peak {stream_peak / 2**20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
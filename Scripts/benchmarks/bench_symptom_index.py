@@ -0,0 +1,61 @@
+"""Latency of the persisted TF-IDF symptom index.
+
+Reports cold load (unpickle) vs. refit time, single-message scoring latency and
+per-message cost in batched mode, and checks the hand-rolled query vectorizer
+against sklearn's transform.
+
+Run from the repository root:  python Scripts/benchmarks/bench_symptom_index.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import symptom_index  # noqa: E402
+from bench_symptom_matcher import make_corpus  # noqa: E402
+
+
+def main(n=20000):
+    corpus = make_corpus(n)
+
+    start = time.perf_counter()
+    state = symptom_index.build_index()
+    fit = time.perf_counter() - start
+    symptom_index.save_index(state)
+    start = time.perf_counter()
+    index = symptom_index.load_index()
+    load = time.perf_counter() - start
+    print(f"fit {fit * 1000:.2f} ms   load {load * 1000:.2f} ms")
+
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    reference = TfidfVectorizer(token_pattern=symptom_index.TOKEN_PATTERN.pattern, ngram_range=symptom_index.NGRAM_RANGE)
+    reference.fit(index.phrases)
+    sample = corpus[:500]
+    assert np.allclose(reference.transform(sample).toarray(), index.transform(sample).toarray())
+
+    start = time.perf_counter()
+    for text in corpus[:5000]:
+        index.score(text)
+    single = (time.perf_counter() - start) / 5000
+
+    start = time.perf_counter()
+    reference_single = corpus[:500]
+    for text in reference_single:
+        reference.transform([text]) @ index.condition_matrix.T
+    sklearn_single = (time.perf_counter() - start) / len(reference_single)
+
+    start = time.perf_counter()
+    index.score_batch(corpus)
+    batch = (time.perf_counter() - start) / len(corpus)
+
+    print(f"single message  sklearn transform {sklearn_single * 1e6:8.2f} us   index {single * 1e6:8.2f} us")
+    print(f"batched ({n})   {batch * 1e6:8.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Symptom classification: chained substring checks vs. the compiled matcher.
+
+Compares, on a fixed corpus of synthetic messages:
+  - the assistant's old if/elif `in` chain vs. assistant_matcher.first_match
+  - the notebook's per-condition phrase loop vs. condition_matcher.rank
+  - one-at-a-time scoring vs. condition_matcher.scores_batch
+  - the phrase loop vs. the matcher on a synthetic 50x larger symptom table,
+    since the loop grows with the number of phrases and the matcher does not
+
+Run from the repository root:  python Scripts/benchmarks/bench_symptom_matcher.py
+"""
+import os
+import random
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from symptom_matcher import CONDITION_SYMPTOMS, SymptomMatcher, assistant_matcher, condition_matcher  # noqa: E402
+
+FILLER = ["i have been", "feeling", "lately", "and", "a lot of", "at night", "with", "some", "really", "since work got busy"]
+
+
+def make_corpus(n, seed=42):
+    rng = random.Random(seed)
+    phrases = [p for symptoms in CONDITION_SYMPTOMS.values() for p in symptoms]
+    return [
+        " ".join(rng.choice(FILLER) + " " + rng.choice(phrases) for _ in range(rng.randint(1, 4)))
+        for _ in range(n)
+    ]
+
+
+def chained_condition(symptoms):
+    symptoms = symptoms.lower()
+    if "low mood" in symptoms or "sadness" in symptoms or "hopeless" in symptoms:
+        return "depression"
+    elif "worry" in symptoms or "anxious" in symptoms or "panic" in symptoms:
+        return "anxiety"
+    elif "sleep" in symptoms or "insomnia" in symptoms:
+        return "sleep issues"
+    return "mental health challenges"
+
+
+def make_large_table(n_conditions=100, per_condition=40, seed=7):
+    rng = random.Random(seed)
+    words = sorted({w for symptoms in CONDITION_SYMPTOMS.values() for p in symptoms for w in p.split()})
+    table = {f"condition {i}": [" ".join(rng.sample(words, 2)) for _ in range(per_condition)] for i in range(n_conditions)}
+    table.update(CONDITION_SYMPTOMS)
+    return table
+
+
+def looped_rank(symptoms_text, table=CONDITION_SYMPTOMS):
+    symptoms_text = symptoms_text.lower()
+    matches = {}
+    for condition, symptoms in table.items():
+        matched = [s for s in symptoms if s in symptoms_text]
+        if matched:
+            matches[condition] = {"matched_symptoms": matched, "matched_count": len(matched)}
+    return sorted(matches.items(), key=lambda x: x[1]["matched_count"], reverse=True)
+
+
+def timed(fn, corpus):
+    start = time.perf_counter()
+    result = [fn(text) for text in corpus]
+    return (time.perf_counter() - start) / len(corpus), result
+
+
+def main(n=20000):
+    corpus = make_corpus(n)
+
+    before, expected = timed(chained_condition, corpus)
+    after, actual = timed(lambda t: assistant_matcher.first_match(t, "mental health challenges"), corpus)
+    assert expected == actual
+    print(f"assistant condition   chain {before * 1e6:7.2f} us   matcher {after * 1e6:7.2f} us")
+
+    before, expected = timed(looped_rank, corpus)
+    after, actual = timed(condition_matcher.rank, corpus)
+    assert [[c for c, _ in r] for r in expected] == [[c for c, _ in r] for r in actual]
+    print(f"notebook rank         loop  {before * 1e6:7.2f} us   matcher {after * 1e6:7.2f} us")
+
+    single, _ = timed(condition_matcher.scores, corpus)
+    start = time.perf_counter()
+    condition_matcher.scores_batch(corpus)
+    batch = (time.perf_counter() - start) / len(corpus)
+    print(f"condition scores      single {single * 1e6:6.2f} us   batch   {batch * 1e6:7.2f} us/message")
+
+    table = make_large_table()
+    large_matcher = SymptomMatcher(table)
+    before, expected = timed(lambda t: looped_rank(t, table), corpus)
+    after, actual = timed(large_matcher.rank, corpus)
+    assert [[c for c, _ in r] for r in expected] == [[c for c, _ in r] for r in actual]
+    print(f"large table ({len(large_matcher.phrases)} phrases) loop {before * 1e6:7.2f} us   matcher {after * 1e6:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Throughput of trend and comparison queries: pandas filtering vs. the PanelCube.
+
+Each query is answered both ways over Data/all.csv (a boolean filter or
+groupby per query, as the notebooks do it, vs. an index/slice of the cube) and
+the answers are checked against each other before timing.
+
+Run from the repository root:  python Scripts/benchmarks/bench_trends.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from trends import ALL_CSV_CONDITIONS, build_cubes  # noqa: E402
+
+COLUMNS = {name: column for column, name in ALL_CSV_CONDITIONS.items()}
+
+
+def pandas_change(df, entity, condition, start_year, end_year):
+    rows = df[df["Entity"] == entity]
+    start = rows.loc[rows["Year"] == start_year, COLUMNS[condition]].iloc[0]
+    end = rows.loc[rows["Year"] == end_year, COLUMNS[condition]].iloc[0]
+    return end - start
+
+
+def pandas_rank(df, condition, year, top=10):
+    rows = df[(df["Year"] == year) & df["Code"].notna() & ~df["Code"].str.startswith("OWID", na=False)]
+    rows = rows.sort_values(COLUMNS[condition], ascending=False, kind="stable").head(top)
+    return list(zip(rows["Entity"], rows[COLUMNS[condition]]))
+
+
+def pandas_cagr(df, start_year, end_year):
+    columns = list(COLUMNS.values())
+    start = df[df["Year"] == start_year].set_index("Entity")[columns]
+    end = df[df["Year"] == end_year].set_index("Entity")[columns]
+    return ((end / start) ** (1.0 / (end_year - start_year)) - 1) * 100
+
+
+def pandas_percentile(df, entity, condition, year):
+    rows = df[(df["Year"] == year) & df["Code"].notna() & ~df["Code"].str.startswith("OWID", na=False)]
+    values = rows[COLUMNS[condition]]
+    value = values[rows["Entity"] == entity].iloc[0]
+    return (values < value).sum() / len(values) * 100
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def report(name, baseline, cube):
+    print(f"{name:<22} pandas {1 / baseline:>10.0f}/s   cube {1 / cube:>10.0f}/s   x{baseline / cube:.0f}")
+
+
+def main():
+    df = pd.read_csv(os.path.join(DATA_DIR, "all.csv"))
+    start = time.perf_counter()
+    cube = build_cubes(df)["all"]
+    print(f"cube build {(time.perf_counter() - start) * 1000:.1f} ms  shape {cube.values.shape}")
+
+    first, last = int(cube.years[0]), int(cube.years[-1])
+    countries = [e for e, is_country in zip(cube.entities, cube.is_country) if is_country]
+
+    # Same answers both ways
+    for entity in countries[:20]:
+        assert np.isclose(pandas_change(df, entity, "anxiety", first, last), cube.change(entity, "anxiety", first)["change"])
+        assert np.isclose(pandas_percentile(df, entity, "depression", last), cube.percentile(entity, "depression", last))
+    assert [e for e, _ in pandas_rank(df, "bipolar", last)] == [e for e, _ in cube.rank("bipolar", last)]
+    expected = pandas_cagr(df, first, last).reindex(cube.entities).to_numpy()
+    assert np.allclose(expected, cube.cagr(first), equal_nan=True)
+
+    entities = iter(countries * 1000)
+    report("change (1 entity)",
+           timed(lambda: pandas_change(df, next(entities), "anxiety", first, last), 300),
+           timed(lambda: cube.change(next(entities), "anxiety", first), 20000))
+    report("rank (1 year)",
+           timed(lambda: pandas_rank(df, "depression", last), 300),
+           timed(lambda: cube.rank("depression", last), 5000))
+    report("cagr (all entities)",
+           timed(lambda: pandas_cagr(df, first, last), 300),
+           timed(lambda: cube.cagr(first), 5000))
+    report("percentile (1 entity)",
+           timed(lambda: pandas_percentile(df, next(entities), "depression", last), 300),
+           timed(lambda: cube.percentile(next(entities), "depression"), 20000))
+    report("summary (1 entity)",
+           timed(lambda: [pandas_change(df, next(entities), c, first, last) for c in COLUMNS], 100),
+           timed(lambda: cube.summary(next(entities)), 20000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Throughput scaling and memory of the shared-memory worker pool.
+
+Drives the same scripted conversations through WorkerPool.process_batch with
+1..N workers (default N: every core) and reports turns per second against a
+single in-process SessionManager. Sessions are advanced in rounds, one
+message per session per round, so each round is one batch per worker.
+
+For N workers it then compares resident private memory per worker with the
+datasets in shared memory (and chat_server's warm-up built once before
+forking) against each worker loading and warming up its own copy.
+
+Run from the repository root:  python Scripts/benchmarks/bench_worker_pool.py [max_workers] [sessions]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import mental_health_assistant as assistant  # noqa: E402
+from chat_server import warm_up  # noqa: E402
+from worker_pool import WorkerPool  # noqa: E402
+
+SCRIPT = ["3", "a few weeks", "I feel anxious and worry all the time", "usa", "yes", "yes", "exit"]
+
+
+def rounds(sessions):
+    return [[(f"session-{i}", message) for i in range(sessions)] for message in SCRIPT]
+
+
+def in_process(sessions, repeat):
+    manager = assistant.SessionManager()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for batch in rounds(sessions):
+            for session_id, message in batch:
+                manager.process(session_id, message)
+    return repeat * sessions * len(SCRIPT) / (time.perf_counter() - start)
+
+
+def pooled(pool, sessions, repeat):
+    pool.process_batch(rounds(sessions)[0])  # first contact outside the timing
+    for batch in rounds(sessions)[1:]:
+        pool.process_batch(batch)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for batch in rounds(sessions):
+            pool.process_batch(batch)
+    return repeat * sessions * len(SCRIPT) / (time.perf_counter() - start)
+
+
+def worker_memory(workers, shared):
+    with WorkerPool(workers, shared=shared, initializer=warm_up) as pool:
+        for batch in rounds(50):
+            pool.process_batch(batch)
+        return [w["private_bytes"] for w in pool.stats()["workers"]], pool.summary()["shared_bytes"]
+
+
+def main(max_workers=None, sessions=500, repeat=5):
+    max_workers = max_workers or os.cpu_count() or 1
+    os.chdir(os.path.join(DATA_DIR, "processed_data"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        assistant.load_all_datasets()
+        assistant.get_country_data("India")
+        in_process(sessions, 1)
+    print(f"cores: {os.cpu_count()}   sessions: {sessions}   turns per run: {sessions * len(SCRIPT) * repeat}")
+
+    baseline = in_process(sessions, repeat)
+    print(f"{'in-process':<12} {baseline:12,.0f} turns/s")
+    single = None
+    for workers in range(1, max_workers + 1):
+        with contextlib.redirect_stdout(io.StringIO()), WorkerPool(workers) as pool:
+            throughput = pooled(pool, sessions, repeat)
+        single = single or throughput
+        print(f"{workers:>2} worker(s) {throughput:12,.0f} turns/s   x{throughput / single:.2f} vs 1 worker")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        shared, shared_bytes = worker_memory(max_workers, shared=True)
+        private, _ = worker_memory(max_workers, shared=False)
+    if None not in shared + private:
+        print(f"\nprivate memory per worker ({max_workers} workers)")
+        print(f"  shared datasets   {sum(shared) / len(shared) / 2**20:8.1f} MiB   (+{shared_bytes / 2**20:.1f} MiB shared once)")
+        print(f"  private copies    {sum(private) / len(private) / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
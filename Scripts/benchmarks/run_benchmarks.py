@@ -0,0 +1,281 @@
+"""Benchmark suite for loading, lookups and scripted conversations, with baseline comparison.
+
+Cases (each timed over several rounds; the median and best per-operation time
+are recorded):
+
+  load_datasets.cold / .warm          chatbot_utils.load_datasets() + reading every table,
+                                      without / with the columnar caches in place
+  load_all_datasets.cold / .warm      the same for mental_health_assistant
+  getter.<name>                       each chatbot_utils getter over every entity of its table
+  get_country_data                    every entity of the prevalence and all.csv panels
+  get_global_averages                 every year of the prevalence panel
+  conversation                        scripted conversations through process_user_input,
+                                      stdout captured
+
+The conversations' captured output is hashed and stored with the timings, so
+a change in what the assistant says shows up next to a change in how fast it
+says it. chatbot_utils.load_datasets() expects survey files that are not
+shipped in Data/; as in bench_chatbot_utils.py, processed tables with the same
+layout stand in for them (copied into a temporary data/ directory).
+
+Results are written to Scripts/benchmarks/results/<timestamp>.json. With a
+baseline (default results/baseline.json) every case slower than it by more
+than --tolerance is flagged and the run exits with status 1.
+
+Run from the repository root:  python Scripts/benchmarks/run_benchmarks.py [--save-baseline]
+"""
+import argparse
+import contextlib
+import datetime
+import hashlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "Data")
+RESULTS_DIR = os.path.join(SCRIPTS_DIR, "benchmarks", "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import chatbot_utils  # noqa: E402
+import mental_health_assistant as assistant  # noqa: E402
+from bench_chatbot_utils import STAND_INS  # noqa: E402
+from dataset_cache import cache_dir_for  # noqa: E402
+
+# Stand-ins for the chatbot_utils.load_datasets() files not present in Data/
+SURVEY_STAND_INS = {
+    "perceived-comfort-speaking-anxiety-depression.csv": "processed_data/dealing_anxiety.csv",
+    "stand-alone-policy-or-plan-for-mental-health.csv": "processed_data/dealt_anxiety.csv",
+    "share-who-say-its-extremely-important-for-the-national-government-to-fund-research-on-anxietydepression.csv": "processed_data/dealt_anxiety.csv",
+    "share-who-report-lifetime-anxiety-or-depression.csv": "processed_data/filled_form.csv",
+    "science-helps-a-lot-treating-anxiety-depression-vs-gdp-per-capita.csv": "processed_data/filled_form.csv",
+    "schizophrenia-prevalence.csv": "schizophrenia-prevalence.csv",
+    "schizophrenia-prevalence-males-vs-females.csv": "schizophrenia-prevalence.csv",
+    "schizophrenia-prevalence-by-age.csv": "schizophrenia-prevalence.csv",
+    "psychiatrists-working-in-the-mental-health-sector.csv": "processed_data/dealing_anxiety.csv"
+}
+
+CONVERSATIONS = [
+    ["3", "a few weeks", "I feel anxious and worry all the time", "India", "yes", "yes", "exit"],
+    ["2", "months", "low mood, trouble sleeping and feeling hopeless", "usa", "yes", "yes", "exit"],
+    ["8", "days", "irritability", "Narnia", "no", "no", "exit"],
+    ["eleven", "5", "weeks", "panic attacks", "the uk", "yes", "no", "exit"],
+    ["4", "a year", "sad and empty", "Inida", "yes", "yes", "exit"]
+]
+
+def measure(fn, setup=None, rounds=5, ops=1):
+    """Per-operation seconds over several rounds; setup runs untimed before each"""
+    times = []
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) / ops)
+    return {"median": statistics.median(times), "best": min(times), "rounds": rounds, "ops": ops}
+
+@contextlib.contextmanager
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+# Loading
+
+def clear_caches(paths):
+    for path in paths:
+        shutil.rmtree(cache_dir_for(path), ignore_errors=True)
+
+def load_survey_tables():
+    data = chatbot_utils.load_datasets()
+    for name in data.loaders:
+        data.get(name)
+
+def load_assistant_tables():
+    with quiet():
+        assistant.load_all_datasets()
+    for name in assistant.DATASET_FILES:
+        assistant.datasets.get(name)
+
+def loading_cases(results, rounds):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.mkdir(os.path.join(tmp, "data"))
+        survey_paths = []
+        for name, source in SURVEY_STAND_INS.items():
+            path = os.path.join(tmp, "data", name)
+            shutil.copyfile(os.path.join(DATA_DIR, source), path)
+            survey_paths.append(os.path.join("data", name))
+        os.chdir(tmp)
+        results["load_datasets.cold"] = measure(load_survey_tables, lambda: clear_caches(survey_paths), rounds)
+        load_survey_tables()
+        results["load_datasets.warm"] = measure(load_survey_tables, rounds=rounds)
+
+    os.chdir(os.path.join(DATA_DIR, "processed_data"))
+    paths = list(assistant.DATASET_FILES.values())
+    results["load_all_datasets.cold"] = measure(load_assistant_tables, lambda: clear_caches(paths), rounds)
+    load_assistant_tables()
+    results["load_all_datasets.warm"] = measure(load_assistant_tables, rounds=rounds)
+
+# Lookups
+
+def getter_cases(results, rounds):
+    for name, (path, getter) in STAND_INS.items():
+        table = chatbot_utils.load_indexed_csv(os.path.join(DATA_DIR, path), chatbot_utils.SCHEMAS[name])
+        countries = [entity.title() for entity in table.frame["Entity"].unique()]
+
+        def run():
+            for country in countries:
+                getter(country, table)
+        results[f"getter.{getter.__name__}"] = measure(run, rounds=rounds, ops=len(countries))
+
+def assistant_lookup_cases(results, rounds):
+    os.chdir(os.path.join(DATA_DIR, "processed_data"))
+    load_assistant_tables()
+    entities = sorted(set(assistant.datasets.get("prevalence")["Entity"]) | set(assistant.datasets.get("all")["Entity"]))
+    years = sorted(assistant.get_prevalence_aggregates()["by_year"])
+    with quiet():
+        assistant.get_country_data(entities[0])  # snapshots and resolver built outside the timings
+
+    def country_data():
+        for entity in entities:
+            assistant.get_country_data(entity)
+
+    def global_averages():
+        for year in years:
+            assistant.get_global_averages(year)
+
+    results["get_country_data"] = measure(country_data, rounds=rounds, ops=len(entities))
+    results["get_global_averages"] = measure(global_averages, rounds=rounds, ops=len(years))
+
+# Conversations
+
+def run_conversations():
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        for script in CONVERSATIONS:
+            session = assistant.Session()
+            for message in script:
+                if not assistant.process_user_input(message, session):
+                    break
+    return output.getvalue()
+
+def conversation_cases(results, checks, rounds):
+    os.chdir(os.path.join(DATA_DIR, "processed_data"))
+    load_assistant_tables()
+    transcript = run_conversations()
+    turns = sum(len(script) for script in CONVERSATIONS)
+    results["conversation"] = measure(run_conversations, rounds=rounds, ops=turns)
+    checks["conversation_output_sha1"] = hashlib.sha1(transcript.encode()).hexdigest()
+
+# Results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(rounds):
+    cwd = os.getcwd()
+    cases = {}
+    checks = {}
+    try:
+        loading_cases(cases, rounds)
+        getter_cases(cases, rounds)
+        assistant_lookup_cases(cases, rounds)
+        conversation_cases(cases, checks, rounds)
+    finally:
+        os.chdir(cwd)
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor() or None
+        },
+        "cases": cases,
+        "checks": checks
+    }
+
+def compare(current, baseline, tolerance):
+    """Rows of (case, baseline median, current median, ratio, flag); flag is None when within tolerance"""
+    rows = []
+    for case, result in current["cases"].items():
+        before = baseline["cases"].get(case)
+        if before is None:
+            rows.append((case, None, result["median"], None, "new"))
+            continue
+        ratio = result["median"] / before["median"] if before["median"] else None
+        flag = "REGRESSION" if ratio is not None and ratio > 1 + tolerance else None
+        rows.append((case, before["median"], result["median"], ratio, flag))
+    for check, value in current["checks"].items():
+        if check in baseline.get("checks", {}) and baseline["checks"][check] != value:
+            rows.append((check, None, None, None, "CHANGED"))
+    return rows
+
+def format_time(seconds):
+    if seconds is None:
+        return "-"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} us"
+
+def print_report(current, rows=None):
+    print(f"{'case':<44} {'baseline':>12} {'median':>12} {'best':>12} {'ratio':>8}")
+    flags = {row[0]: row for row in rows or []}
+    for case, result in current["cases"].items():
+        _, before, _, ratio, flag = flags.get(case, (case, None, None, None, None))
+        ratio_text = f"{ratio:.2f}x" if ratio is not None else "-"
+        print(f"{case:<44} {format_time(before):>12} {format_time(result['median']):>12} "
+              f"{format_time(result['best']):>12} {ratio_text:>8}  {flag or ''}")
+    for case, _, _, _, flag in rows or []:
+        if flag == "CHANGED":
+            print(f"{case}: differs from the baseline")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare against a baseline")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a case is flagged")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--output", help="results file (default: results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    current = run_suite(args.rounds)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, current["meta"]["timestamp"].replace(":", "") + ".json")
+    with open(output, "w") as f:
+        json.dump(current, f, indent=1)
+
+    rows = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            rows = compare(current, json.load(f), args.tolerance)
+    print_report(current, rows)
+    print(f"\nresults written to {output}")
+
+    if args.save_baseline:
+        shutil.copyfile(output, args.baseline)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if rows is None:
+        print("no baseline to compare against (run with --save-baseline to store one)")
+        return 0
+    regressions = [row for row in rows if row[4] in ("REGRESSION", "CHANGED")]
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed or changed output")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
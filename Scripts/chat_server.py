@@ -0,0 +1,339 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import sys
+import uuid
+from urllib.parse import urlsplit
+
+import mental_health_assistant as assistant
+import metrics
+from worker_pool import WorkerPool
+
+# Asyncio HTTP + WebSocket front end for the mental health assistant.
+#
+#   GET  /            the chat page (templates/index.html)
+#   GET  /health      session and dataset statistics
+#   GET  /metrics     latency histograms and cache counters (see metrics.py)
+#   GET  /metrics.txt the same as a plain-text report
+#   POST /api/session start a conversation -> {"session_id", "replies"}
+#   POST /api/chat    {"session_id", "message"} -> {"session_id", "replies", "continue"}
+#   GET  /ws          WebSocket; each text frame is one user message, each reply
+#                     frame is the same JSON as /api/chat
+#
+# Datasets are loaded once, off the event loop, before the server accepts
+# connections. After that a turn is in-memory lookups and string formatting, so
+# handlers run inline on the loop. With --workers N, turns go instead to N forked
+# processes sharing one copy of the datasets and of everything warm_up builds
+# from them (worker_pool.py), and the loop only waits on their replies. A turn
+# that raises is answered with 500 (a WebSocket closes with 1011).
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "index.html")
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY_BYTES = 64 * 1024
+MAX_MESSAGE_BYTES = 64 * 1024  # one WebSocket message, all of its frames together
+
+STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+    500: "Internal Server Error"
+}
+
+class RequestError(Exception):
+    """A request the server refuses: answered with this status, then the connection is closed"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def warm_up():
+    """Load everything a turn reads so no request pays for parsing a CSV"""
+    assistant.get_snapshot("prevalence")
+    assistant.get_snapshot("dealing_anxiety")
+    assistant.get_prevalence_aggregates()
+    assistant.get_trend_cubes()
+    assistant.get_condition_model()
+    assistant.get_country_resolver()
+
+class ChatServer:
+    def __init__(self, host="127.0.0.1", port=8000, manager=None):
+        self.host = host
+        self.port = port
+        self.manager = manager if manager is not None else assistant.SessionManager()
+        self.pooled = isinstance(self.manager, WorkerPool)
+        self.server = None
+        self.requests = 0
+
+    async def start(self):
+        if self.pooled:
+            self.manager.bind(asyncio.get_running_loop())
+        else:
+            if not assistant.datasets and not assistant.load_all_datasets():
+                raise RuntimeError("the datasets could not be loaded")
+            await asyncio.get_running_loop().run_in_executor(None, warm_up)
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    # Conversation API
+
+    def start_session(self):
+        session_id = uuid.uuid4().hex
+        self.manager.get(session_id)
+        return {"session_id": session_id, "replies": [assistant.GREETING], "continue": True}
+
+    async def chat(self, session_id, message):
+        self.requests += 1
+        if not session_id:
+            session_id = uuid.uuid4().hex
+        if self.pooled:
+            replies, continue_chat = await self.manager.process_async(session_id, message.strip())
+        else:
+            replies, continue_chat = self.manager.process(session_id, message.strip())
+        return {"session_id": session_id, "replies": replies, "continue": continue_chat}
+
+    def health(self):
+        health = {
+            "sessions": len(self.manager),
+            "expired_sessions": self.manager.expired,
+            "requests": self.requests,
+            "datasets": assistant.datasets.stats(),
+            "responses": assistant.renderer.stats(),
+            "condition_model": assistant.condition_model_status()
+        }
+        if self.pooled:
+            health["pool"] = self.manager.summary()
+        return health
+
+    # HTTP
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                        if not headers.get("sec-websocket-key"):
+                            raise RequestError(400, "missing Sec-WebSocket-Key")
+                        await self.handle_websocket(reader, writer, headers)
+                        break
+                except RequestError as e:
+                    # The rest of the request is not read, so the connection cannot be reused
+                    status, content_type, payload = json_response(e.status, {"error": str(e)})
+                    writer.write(build_response(status, content_type, payload, keep_alive=False))
+                    await writer.drain()
+                    break
+                status, content_type, payload = await self.route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(build_response(status, content_type, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if path == "/" and method == "GET":
+            with open(TEMPLATE_PATH, "rb") as f:
+                return 200, "text/html; charset=utf-8", f.read()
+        if path == "/health" and method == "GET":
+            return json_response(200, self.health())
+        if path == "/metrics" and method == "GET":
+            return json_response(200, metrics.snapshot())
+        if path == "/metrics.txt" and method == "GET":
+            return 200, "text/plain; charset=utf-8", metrics.report().encode()
+        if path == "/api/session" and method == "POST":
+            return json_response(200, self.start_session())
+        if path == "/api/chat":
+            if method != "POST":
+                return json_response(405, {"error": "use POST"})
+            try:
+                data = json.loads(body or b"{}")
+                message = data["message"]
+            except (ValueError, KeyError, TypeError):
+                return json_response(400, {"error": "expected a JSON body with a 'message' field"})
+            try:
+                return json_response(200, await self.chat(data.get("session_id"), str(message)))
+            except Exception as e:
+                print(f"Turn failed: {e!r}")
+                return json_response(500, {"error": "the assistant could not answer this message"})
+        return json_response(404, {"error": f"no route for {method} {path}"})
+
+    # WebSocket
+
+    async def handle_websocket(self, reader, writer, headers):
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest())
+        writer.write(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+        greeting = self.start_session()
+        session_id = greeting["session_id"]
+        writer.write(encode_frame(json.dumps(greeting).encode()))
+        await writer.drain()
+
+        while True:
+            try:
+                frame = await read_message(reader, writer)
+            except RequestError:
+                writer.write(encode_frame(struct.pack("!H", 1009), opcode=0x8))  # 1009: message too big
+                await writer.drain()
+                break
+            if frame is None:
+                break
+            text = frame.decode("utf-8", errors="replace")
+            try:
+                data = json.loads(text)
+                message = data["message"] if isinstance(data, dict) else text
+            except (ValueError, KeyError):
+                message = text
+            try:
+                result = await self.chat(session_id, str(message))
+            except Exception as e:
+                print(f"Turn failed: {e!r}")
+                writer.write(encode_frame(struct.pack("!H", 1011), opcode=0x8))  # 1011: internal error
+                await writer.drain()
+                break
+            writer.write(encode_frame(json.dumps(result).encode()))
+            await writer.drain()
+            if not result["continue"]:
+                writer.write(encode_frame(b"", opcode=0x8))
+                await writer.drain()
+                break
+        self.manager.end(session_id)
+
+async def read_request(reader):
+    """Read one HTTP/1.1 request; None when the client closed the connection
+
+    Raises RequestError for a malformed or oversized request, before reading
+    any body.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise RequestError(400, "request headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ")
+    if len(parts) != 3:
+        raise RequestError(400, "malformed request line")
+    method, target, _ = parts
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError(400, "invalid Content-Length")
+    if length < 0:
+        raise RequestError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise RequestError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, urlsplit(target).path, headers, body
+
+def json_response(status, data):
+    return status, "application/json", json.dumps(data).encode()
+
+def build_response(status, content_type, payload, keep_alive=True):
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + payload
+
+def encode_frame(payload, opcode=0x1):
+    """Unmasked server-to-client frame"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+async def read_frame(reader):
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > MAX_MESSAGE_BYTES:
+        raise RequestError(413, "frame too large")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+        payload = (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big")
+    return bool(first & 0x80), opcode, payload
+
+async def read_message(reader, writer):
+    """Next complete text/binary message, answering pings; None on close"""
+    parts = []
+    while True:
+        fin, opcode, payload = await read_frame(reader)
+        if opcode == 0x8:
+            writer.write(encode_frame(payload[:2], opcode=0x8))
+            return None
+        if opcode == 0x9:
+            writer.write(encode_frame(payload, opcode=0xA))
+            continue
+        if opcode == 0xA:
+            continue
+        parts.append(payload)
+        if sum(len(part) for part in parts) > MAX_MESSAGE_BYTES:
+            raise RequestError(413, "message too large")
+        if fin:
+            return b"".join(parts)
+
+async def run(host, port, manager=None):
+    server = await ChatServer(host, port, manager).start()
+    print(f"Mental Health Assistant listening on http://{host}:{server.port}")
+    if assistant.condition_model_status().startswith("unavailable"):
+        print("Condition model not built; run python Scripts/condition_model.py", file=sys.stderr)
+    await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the mental health assistant over HTTP and WebSocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--metrics", action="store_true", help="record latencies and cache counters for GET /metrics")
+    parser.add_argument("--workers", type=int, default=0, help="serve turns from N worker processes sharing the datasets")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+    # Workers are forked before the event loop (and its executor threads) exist
+    pool = WorkerPool(args.workers, initializer=warm_up).start() if args.workers else None
+    try:
+        asyncio.run(run(args.host, args.port, pool))
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"Could not start the server: {e}")
+    finally:
+        if pool is not None:
+            pool.close()
@@ -1,8 +1,19 @@
 
+import csv
+import json
 import pandas as pd
+from collections import OrderedDict
+from functools import partial
 
-# Load and normalize datasets
-def load_datasets():
+import metrics
+
+from country_resolver import CountryResolver
+from dataset_cache import read_csv_cached
+from dataset_registry import DatasetRegistry
+from schema import FLAG, CompiledTable, Field, Schema, compile_table
+
+# Load and normalize datasets (each file is read and indexed on first access)
+def load_datasets(memory_budget=None):
     file_paths = {
         "comfort_speaking": "data/perceived-comfort-speaking-anxiety-depression.csv",
         "mental_health_policy": "data/stand-alone-policy-or-plan-for-mental-health.csv",
@@ -15,56 +26,217 @@ def load_datasets():
         "psychiatrists_per_country": "data/psychiatrists-working-in-the-mental-health-sector.csv"
     }
 
-    data = {k: pd.read_csv(v) for k, v in file_paths.items()}
-    for df in data.values():
-        if 'Entity' in df.columns:
-            df['Entity'] = df['Entity'].str.strip().str.lower()
-    return data
+    loaders = {k: partial(load_indexed_csv, v, SCHEMAS.get(k)) for k, v in file_paths.items()}
+    return DatasetRegistry(loaders, memory_budget=memory_budget)
+
+# Header of the lifetime survey file (the same export as Data/Filled_form.csv)
+LIFETIME_COLUMN = "Share - Question: mh7a - Have been anxious/depressed - Answer: Yes - Gender: all - Age_group: all"
+
+# Schemas of the datasets the getters read, checked and compiled when a file loads.
+# Fields keep the column positions the getters have always used, pinned to
+# their header label where the file's header is known (the other survey files
+# are not in Data/); their names are also the batch report's columns.
+SCHEMAS = {
+    "comfort_speaking": Schema({"comfort_very": 2, "comfort_somewhat": 3, "comfort_not_at_all": 4}),
+    "mental_health_policy": Schema({"has_policy": Field(-1, FLAG)}),
+    "gov_funding_support": Schema({"research_support": -1}),
+    "lifetime_anxiety_depression": Schema({"lifetime_prevalence": Field(-1, label=LIFETIME_COLUMN)}),
+    "psychiatrists_per_country": Schema({"psychiatrists_per_100k": -1})
+}
+
+# Entity index
+class EntityIndex(dict):
+    """Normalized Entity -> first matching row (as a tuple), for datasets without a schema"""
+
+    def __init__(self, frame):
+        super().__init__()
+        self.frame = frame
+        if "Entity" not in frame.columns:
+            return
+        entity_pos = frame.columns.get_loc("Entity")
+        for row in frame.itertuples(index=False, name=None):
+            self.setdefault(row[entity_pos], row)
+
+# One country index over every dataset indexed so far (names, ISO codes, aliases)
+resolver = CountryResolver()
+metrics.register_source("chatbot_utils.resolver", resolver.stats)
+
+def normalize_entity(name):
+    return str(name).strip().lower()
+
+def resolve_entity(name):
+    """Normalized key of the Entity a user-supplied name refers to ("USA" -> "united states")"""
+    canonical = resolver.resolve(name)
+    return normalize_entity(canonical if canonical is not None else name)
+
+def index_dataset(df, schema=None, source="table"):
+    """Normalize the Entity column of a dataset and index it for O(1) lookups
+
+    With a schema the table is validated and compiled (see schema.py);
+    otherwise rows are indexed as tuples.
+    """
+    if 'Entity' in df.columns:
+        resolver.add_frame(df)
+        df['Entity'] = df['Entity'].str.strip().str.lower()
+    if schema is not None:
+        return compile_table(df, schema, source)
+    return EntityIndex(df)
+
+def index_datasets(data):
+    return {name: index_dataset(df, SCHEMAS.get(name), name) for name, df in data.items()}
+
+@metrics.timed
+def load_indexed_csv(path, schema=None):
+    return index_dataset(read_csv_cached(path), schema, path)
+
+# Tables compiled for getters called with a plain DataFrame, keyed by the frame's
+# identity (the frame is held, so its id cannot be reused while cached)
+COMPILED_CACHE_SIZE = 32
+_compiled = OrderedDict()
+
+def compiled_table(table, name):
+    """Compiled form of a getter's table; a DataFrame is compiled on first use and then reused"""
+    if isinstance(table, CompiledTable):
+        return table
+    frame = table.frame if isinstance(table, EntityIndex) else table
+    key = (name, id(frame))
+    entry = _compiled.get(key)
+    if entry is not None:
+        _compiled.move_to_end(key)
+        return entry[1]
+    compiled = index_dataset(frame.copy(), SCHEMAS[name], name)
+    _compiled[key] = (frame, compiled)
+    if len(_compiled) > COMPILED_CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
+
+def _find_row(country, table, name):
+    """(compiled table, row) for a country"""
+    table = compiled_table(table, name)
+    return table, table.row(resolve_entity(country))
 
 # Utility Functions
+@metrics.timed
 def get_comfort_stats(country, df):
-    country = country.lower()
-    row = df[df["Entity"] == country]
-    if not row.empty:
-        very = row.iloc[0, 2]
-        some = row.iloc[0, 3]
-        none = row.iloc[0, 4]
+    table, row = _find_row(country, df, "comfort_speaking")
+    country = resolve_entity(country)
+    if row is not None:
+        very, some, none = table.values[row]
         return f"In {country.title()}, {very:.1f}% feel very comfortable discussing mental health, {some:.1f}% somewhat comfortable, and {none:.1f}% not at all comfortable."
     return "No comfort speaking data available."
 
+@metrics.timed
 def get_policy_status(country, df):
-    country = country.lower()
-    row = df[df["Entity"] == country]
-    if not row.empty:
-        status = row.iloc[0, -1]
-        return f"{country.title()} has a national mental health policy." if 'yes' in str(status).lower() else f"{country.title()} does not have a national mental health policy."
+    table, row = _find_row(country, df, "mental_health_policy")
+    country = resolve_entity(country)
+    if row is not None:
+        has_policy = table.values[row, 0] == 1.0
+        return f"{country.title()} has a national mental health policy." if has_policy else f"{country.title()} does not have a national mental health policy."
     return "No policy data available."
 
+@metrics.timed
 def get_research_support(country, df):
-    country = country.lower()
-    row = df[df["Entity"] == country]
-    if not row.empty:
-        percent = row.iloc[0, -1]
+    table, row = _find_row(country, df, "gov_funding_support")
+    country = resolve_entity(country)
+    if row is not None:
+        percent = table.values[row, 0]
         return f"{percent:.1f}% of people in {country.title()} think government should fund mental health research."
     return "No data on public research support."
 
+@metrics.timed
 def get_lifetime_disorder_prevalence(country, df):
-    country = country.lower()
-    row = df[df["Entity"] == country]
-    if not row.empty:
-        rate = row.iloc[0, -1]
+    table, row = _find_row(country, df, "lifetime_anxiety_depression")
+    country = resolve_entity(country)
+    if row is not None:
+        rate = table.values[row, 0]
         return f"In {country.title()}, {rate:.1f}% of the population reports having experienced anxiety or depression."
     return "No prevalence data available."
 
+@metrics.timed
 def get_psychiatrist_density(country, df):
-    country = country.lower()
-    row = df[df["Entity"] == country]
-    if not row.empty:
-        rate = row.iloc[0, -1]
+    table, row = _find_row(country, df, "psychiatrists_per_country")
+    country = resolve_entity(country)
+    if row is not None:
+        rate = table.values[row, 0]
         return f"{country.title()} has about {rate:.2f} psychiatrists per 100,000 people."
     return "No psychiatrist data available."
 
+# Batch country reports
+REPORT_FIELDS = ["entity", "country"] + [field for schema in SCHEMAS.values() for field in schema.names]
+
+def report_frame(data):
+    """Every report field for every entity in any of the datasets, one row per normalized Entity"""
+    parts = []
+    for name, schema in SCHEMAS.items():
+        table = data.get(name)
+        if table is None:
+            parts.append(pd.DataFrame(columns=schema.names, dtype=float))
+            continue
+        table = compiled_table(table, name)
+        parts.append(pd.DataFrame(table.values, index=list(table.keys()), columns=schema.names))
+    # One outer join of all five datasets on the Entity key
+    frame = pd.concat(parts, axis=1, join="outer", sort=True)
+    frame["has_policy"] = frame["has_policy"].map({1.0: True, 0.0: False})
+    frame.index.name = "entity"
+    return frame
+
+# Records from the last report_frame(), kept while the same tables are loaded
+_report_cache = {"tables": None, "records": None}
+
+def _report_records(data):
+    """normalized Entity -> report record, rebuilt when any dataset is reloaded"""
+    tables = tuple(data.get(name) for name in SCHEMAS)
+    cached = _report_cache["tables"]
+    if cached is not None and all(a is b for a, b in zip(cached, tables)):
+        return _report_cache["records"]
+    frame = report_frame(data)
+    frame = frame.astype(object).where(frame.notna(), None)
+    records = {}
+    for record in frame.reset_index().to_dict(orient="records"):
+        record["country"] = record["entity"].title()
+        records[record["entity"]] = {field: record[field] for field in REPORT_FIELDS}
+    _report_cache.update(tables=tables, records=records)
+    return records
+
+@metrics.timed
+def country_reports(data, countries=None):
+    """Structured report records for the given countries (default: every entity), missing values as None
+
+    Country names go through the same resolution as the getters ("USA",
+    "uk", ISO codes, small typos); names that match nothing get a record with
+    every field None.
+    """
+    records = _report_records(data)
+    if countries is None:
+        return [dict(record) for record in records.values()]
+    reports = []
+    for country in countries:
+        key = resolve_entity(country)
+        record = records.get(key)
+        if record is None:
+            record = dict.fromkeys(REPORT_FIELDS)
+            record.update(entity=key, country=key.title())
+        reports.append(dict(record))
+    return reports
+
+def write_reports(records, out, fmt="jsonl"):
+    """Stream report records to a text file object as JSON Lines or CSV; returns the count"""
+    count = 0
+    if fmt == "jsonl":
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+            count += 1
+    elif fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    else:
+        raise ValueError(f"unknown report format {fmt!r} (expected 'jsonl' or 'csv')")
+    return count
+
 # Add more as needed (e.g., schizophrenia by age/gender, science trust)
-from chatbot_utils import *
-data = load_datasets()
-print(get_comfort_stats("India", data["comfort_speaking"]))
+if __name__ == "__main__":
+    data = load_datasets()
+    print(get_comfort_stats("India", data["comfort_speaking"]))
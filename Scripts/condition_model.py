@@ -0,0 +1,305 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import content_hash
+from trends import ALL_CSV_CONDITIONS
+
+# Persisted condition-prevalence model.
+#
+# The notebook's run_pipeline() refits, on every run, a StandardScaler plus a
+# RandomForestClassifier and a LogisticRegression per condition, predicting
+# whether a country-year's prevalence is above the median from one-hot country
+# and Year features. train_model() does the same fit once on Data/all.csv and
+# save_model() writes it as plain arrays: scaler mean/scale, logistic
+# coefficients, every forest flattened into node arrays (leaves point to
+# themselves) and the forests' answers tabulated over the country x year grid.
+# Arrays are .npy files loaded with mmap_mode="r"; manifest.json, written last,
+# holds the feature names, metrics and a hash of the training CSV.
+#
+# Training takes several seconds, so it only happens when this module is run
+# ("python condition_model.py [--check] [all.csv]"). The assistant loads with
+# rebuild=False, hashing the all.csv it serves, and goes without the model
+# while it is missing or stale (Scripts/artifacts is not checked in, so that is
+# the state of a fresh checkout until the module has been run once).
+
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts")
+MODEL_DIR = os.path.join(ARTIFACT_DIR, "condition_model")
+MANIFEST = "manifest.json"
+MODEL_VERSION = 1
+TRAINING_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data", "all.csv")
+
+ARRAYS = (
+    "scaler_mean", "scaler_scale", "lr_coef", "lr_intercept",
+    "tree_left", "tree_right", "tree_feature", "tree_threshold", "tree_value", "tree_roots",
+    "forest_table"
+)
+
+def prepare_features(df):
+    """One-hot country (first country dropped) and Year columns, as in the notebook"""
+    dummies = pd.get_dummies(df["Entity"], prefix="country", drop_first=True, dtype=np.float64)
+    X = pd.concat([dummies, df[["Year"]].astype(np.float64)], axis=1)
+    countries = sorted(df["Entity"].unique())
+    return X.to_numpy(), list(X.columns), countries
+
+def encode_grid(df, features):
+    """Feature matrix for Entity/Year rows in the column order of a trained model"""
+    dummies = pd.get_dummies(df["Entity"], prefix="country", dtype=np.float64)
+    X = pd.concat([dummies, df[["Year"]].astype(np.float64)], axis=1)
+    return X.reindex(columns=features, fill_value=0.0).to_numpy()
+
+def flatten_forest(forest, offset):
+    """Node arrays of every tree, indices shifted by offset; leaves loop back to themselves"""
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        ids = np.arange(offset, offset + n, dtype=np.int32)
+        leaf = tree.children_left == -1
+        left.append(np.where(leaf, ids, tree.children_left + offset).astype(np.int32))
+        right.append(np.where(leaf, ids, tree.children_right + offset).astype(np.int32))
+        feature.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        threshold.append(tree.threshold)
+        counts = tree.value[:, 0, :]
+        value.append(counts[:, 1] / counts.sum(axis=1))  # P(above median) at each node
+        roots.append(offset)
+        offset += n
+    return (left, right, feature, threshold, value, roots), offset
+
+def train_model(path=TRAINING_PATH):
+    """Fit the scaler and both models per condition; returns (manifest, arrays, estimators)"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    df = pd.read_csv(path)
+    X, features, countries = prepare_features(df)
+    # The split only depends on the row count, so every condition shares it (and the scaler)
+    train_rows, test_rows = train_test_split(np.arange(len(df)), test_size=0.2, random_state=42)
+    scaler = StandardScaler().fit(X[train_rows])
+    X_train, X_test = scaler.transform(X[train_rows]), scaler.transform(X[test_rows])
+
+    conditions = []
+    metrics = {}
+    medians = {}
+    estimators = {}
+    coef, intercept = [], []
+    nodes = [[] for _ in range(6)]
+    offset = 0
+    for column, condition in ALL_CSV_CONDITIONS.items():
+        medians[condition] = float(df[column].median())
+        y = (df[column] > medians[condition]).astype(int).to_numpy()
+
+        rf_model = RandomForestClassifier(n_estimators=100, random_state=42).fit(X_train, y[train_rows])
+        lr_model = LogisticRegression(max_iter=1000, random_state=42).fit(X_train, y[train_rows])
+        metrics[condition] = {}
+        for name, model in (("random_forest", rf_model), ("logistic_regression", lr_model)):
+            predictions = model.predict(X_test)
+            metrics[condition][name] = {
+                "accuracy": accuracy_score(y[test_rows], predictions),
+                "precision": precision_score(y[test_rows], predictions, zero_division=0),
+                "recall": recall_score(y[test_rows], predictions, zero_division=0),
+                "f1": f1_score(y[test_rows], predictions, zero_division=0)
+            }
+
+        flat, offset = flatten_forest(rf_model, offset)
+        for store, part in zip(nodes, flat):
+            store.extend(part)
+        coef.append(lr_model.coef_[0])
+        intercept.append(lr_model.intercept_[0])
+        conditions.append(condition)
+        estimators[condition] = {"random_forest": rf_model, "logistic_regression": lr_model}
+
+    # The features are only (country, year), so the forests are tabulated over
+    # the whole training grid; predict_proba() then answers whole years by lookup
+    first_year, latest_year = int(df["Year"].min()), int(df["Year"].max())
+    grid_years = np.arange(first_year, latest_year + 1)
+    grid = pd.DataFrame({
+        "Entity": np.repeat(countries, len(grid_years)),
+        "Year": np.tile(grid_years, len(countries))
+    })
+    X_grid = scaler.transform(encode_grid(grid, features))
+    forest_table = np.stack(
+        [estimators[c]["random_forest"].predict_proba(X_grid)[:, 1] for c in conditions], axis=1
+    ).reshape(len(countries), len(grid_years), len(conditions))
+
+    left, right, feature, threshold, value, roots = nodes
+    arrays = {
+        "scaler_mean": scaler.mean_,
+        "scaler_scale": scaler.scale_,
+        "lr_coef": np.array(coef),
+        "lr_intercept": np.array(intercept),
+        "tree_left": np.concatenate(left),
+        "tree_right": np.concatenate(right),
+        "tree_feature": np.concatenate(feature),
+        "tree_threshold": np.concatenate(threshold),
+        "tree_value": np.concatenate(value),
+        "tree_roots": np.array(roots, dtype=np.int32).reshape(len(conditions), -1),
+        "forest_table": forest_table
+    }
+    manifest = {
+        "version": MODEL_VERSION,
+        "training_source": os.path.basename(path),
+        "training_hash": content_hash(path),
+        "features": features,
+        "countries": countries,
+        "conditions": conditions,
+        "medians": medians,
+        "first_year": first_year,
+        "latest_year": latest_year,
+        "metrics": metrics,
+        # Same rule as the notebook's generate_insights
+        "best_model": {
+            c: "random_forest" if m["random_forest"]["f1"] > m["logistic_regression"]["f1"] else "logistic_regression"
+            for c, m in metrics.items()
+        }
+    }
+    return manifest, arrays, estimators
+
+def save_model(manifest, arrays, model_dir=MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    for name in ARRAYS:
+        np.save(os.path.join(model_dir, f"{name}.npy"), np.ascontiguousarray(arrays[name]), allow_pickle=False)
+    # Manifest last: a model directory without one is incomplete and gets retrained
+    tmp_path = os.path.join(model_dir, MANIFEST + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(model_dir, MANIFEST))
+
+def read_manifest(model_dir=MODEL_DIR):
+    try:
+        with open(os.path.join(model_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def check_sync(model_dir=MODEL_DIR, path=TRAINING_PATH):
+    """True when the saved model was trained on the current contents of the training CSV"""
+    manifest = read_manifest(model_dir)
+    return (
+        manifest is not None
+        and manifest.get("version") == MODEL_VERSION
+        and manifest.get("training_hash") == content_hash(path)
+    )
+
+def load_model(model_dir=MODEL_DIR, path=TRAINING_PATH, rebuild=False):
+    """Memory-mapped model; ValueError when missing or out of sync with its data, unless rebuild retrains it"""
+    if not check_sync(model_dir, path):
+        if not rebuild:
+            raise ValueError(f"{model_dir} is missing or out of sync with {path}")
+        manifest, arrays, _ = train_model(path)
+        save_model(manifest, arrays, model_dir)
+    manifest = read_manifest(model_dir)
+    arrays = {name: np.load(os.path.join(model_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAYS}
+    return ConditionModel(manifest, arrays)
+
+class ConditionModel:
+    """Batched P(prevalence above the median) per condition for (country, year) rows"""
+
+    def __init__(self, manifest, arrays):
+        self.manifest = manifest
+        self.conditions = manifest["conditions"]
+        self.countries = manifest["countries"]
+        self.first_year = manifest["first_year"]
+        self.latest_year = manifest["latest_year"]
+        self.best_model = manifest["best_model"]
+        self.arrays = arrays
+        features = manifest["features"]
+        self.n_features = len(features)
+        self.year_column = features.index("Year")
+        self.country_columns = {f[len("country_"):]: i for i, f in enumerate(features) if f.startswith("country_")}
+        self.country_rows = {c: i for i, c in enumerate(self.countries)}
+
+    def __contains__(self, country):
+        return country in self.country_rows
+
+    def features(self, countries, years):
+        """Unscaled feature matrix; unknown countries get the baseline (all-zero) encoding"""
+        X = np.zeros((len(countries), self.n_features))
+        columns = np.array([self.country_columns.get(c, -1) for c in countries], dtype=np.int64)
+        known = columns >= 0
+        X[np.flatnonzero(known), columns[known]] = 1.0
+        X[:, self.year_column] = years
+        return X
+
+    def scale(self, X):
+        return (X - self.arrays["scaler_mean"]) / self.arrays["scaler_scale"]
+
+    def forest_proba(self, X_scaled):
+        """rows x conditions mean leaf probability over each condition's trees"""
+        a = self.arrays
+        left, right = a["tree_left"], a["tree_right"]
+        X32 = np.asarray(X_scaled, dtype=np.float32)  # sklearn trees split on float32 inputs
+        roots = a["tree_roots"]
+        nodes = np.tile(roots.ravel(), len(X32))
+        rows = np.repeat(np.arange(len(X32)), roots.size)
+        # One-hot country splits make deep, lopsided trees, so each step only
+        # advances the (row, tree) pairs that have not reached a leaf yet
+        active = np.arange(len(nodes))
+        while active.size:
+            current = nodes[active]
+            go_left = X32[rows[active], a["tree_feature"][current]] <= a["tree_threshold"][current]
+            current = np.where(go_left, left[current], right[current])
+            nodes[active] = current
+            active = active[left[current] != current]
+        return a["tree_value"][nodes].reshape((len(X32),) + roots.shape).mean(axis=2)
+
+    def forest_lookup(self, countries, years):
+        """Forest probabilities from the precomputed country x year table (integer years only)
+
+        Forest splits on Year fall between training years, so a year outside
+        the training range scores like the nearest end of it.
+        """
+        rows = np.array([self.country_rows.get(c, 0) for c in countries], dtype=np.int64)
+        columns = np.clip(years, self.first_year, self.latest_year).astype(np.int64) - self.first_year
+        return np.array(self.arrays["forest_table"][rows, columns])
+
+    def logistic_proba(self, X_scaled):
+        scores = X_scaled @ self.arrays["lr_coef"].T + self.arrays["lr_intercept"]
+        return 1.0 / (1.0 + np.exp(-scores))
+
+    def predict_proba(self, countries, years=None, model="best"):
+        """rows x conditions probabilities; model is "best", "random_forest" or "logistic_regression" """
+        if years is None:
+            years = np.full(len(countries), self.latest_year)
+        years = np.asarray(years, dtype=np.float64)
+        whole_years = bool(np.all(years == np.round(years)))
+        X_scaled = None
+        if model != "random_forest" or not whole_years:
+            X_scaled = self.scale(self.features(countries, years))
+        if model == "logistic_regression":
+            return self.logistic_proba(X_scaled)
+        forest = self.forest_lookup(countries, years) if whole_years else self.forest_proba(X_scaled)
+        if model == "random_forest":
+            return forest
+        proba = self.logistic_proba(X_scaled)
+        for j, condition in enumerate(self.conditions):
+            if self.best_model[condition] == "random_forest":
+                proba[:, j] = forest[:, j]
+        return proba
+
+    def predict(self, countries, years=None, model="best"):
+        return (self.predict_proba(countries, years, model) > 0.5).astype(np.int8)
+
+    def predict_one(self, country, year=None):
+        """{condition: probability} for one country-year, for the chat handlers"""
+        proba = self.predict_proba([country], None if year is None else [year])[0]
+        return {c: float(p) for c, p in zip(self.conditions, proba)}
+
+if __name__ == "__main__":
+    import sys
+    args = [a for a in sys.argv[1:] if a != "--check"]
+    path = args[0] if args else TRAINING_PATH
+    if "--check" in sys.argv:
+        in_sync = check_sync(path=path)
+        print("condition model is in sync with its training data" if in_sync else "condition model is stale")
+        sys.exit(0 if in_sync else 1)
+    manifest, arrays, _ = train_model(path)
+    save_model(manifest, arrays)
+    print(f"Condition model written to {MODEL_DIR}")
+    for condition, best in manifest["best_model"].items():
+        print(f"  {condition:<14} {best:<20} f1 {manifest['metrics'][condition][best]['f1']:.3f}")
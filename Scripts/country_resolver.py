@@ -0,0 +1,242 @@
+import re
+from collections import OrderedDict
+
+# Country name resolution shared by every dataset.
+#
+# All datasets use Our World in Data Entity names ("United States", "Czechia",
+# "Cote d'Ivoire"), so the Entity spelling is the canonical key. A
+# CountryResolver indexes every Entity it is given, plus its ISO code and the
+# common aliases below, under a normalized form (case, spacing and punctuation
+# folded). Anything that still misses goes through a trigram index to a few
+# candidate names, which are ranked by edit distance; a typo only resolves when
+# exactly one Entity is within its edit budget and no other Entity's name starts
+# with it ("Irak" could be Iraq or Iran, "Dominican" Dominica or the Dominican
+# Republic), so an ambiguous name never silently becomes another country.
+# Results, misses included, are kept in a bounded LRU cache, so a repeated
+# lookup is one dict hit.
+
+# Alias -> OWID Entity name; only used when that Entity has been indexed
+ALIASES = {
+    "us": "United States",
+    "usa": "United States",
+    "united states of america": "United States",
+    "america": "United States",
+    "states": "United States",
+    "uk": "United Kingdom",
+    "great britain": "United Kingdom",
+    "britain": "United Kingdom",
+    "england": "United Kingdom",
+    "scotland": "United Kingdom",
+    "wales": "United Kingdom",
+    "northern ireland": "United Kingdom",
+    "uae": "United Arab Emirates",
+    "emirates": "United Arab Emirates",
+    "korea": "South Korea",
+    "republic of korea": "South Korea",
+    "dprk": "North Korea",
+    "russian federation": "Russia",
+    "czech republic": "Czechia",
+    "ivory coast": "Cote d'Ivoire",
+    "burma": "Myanmar",
+    "holland": "Netherlands",
+    "drc": "Democratic Republic of Congo",
+    "dr congo": "Democratic Republic of Congo",
+    "congo kinshasa": "Democratic Republic of Congo",
+    "republic of the congo": "Congo",
+    "congo brazzaville": "Congo",
+    "swaziland": "Eswatini",
+    "macedonia": "North Macedonia",
+    "cabo verde": "Cape Verde",
+    "timor leste": "East Timor",
+    "turkiye": "Turkey",
+    "viet nam": "Vietnam",
+    "lao pdr": "Laos",
+    "persia": "Iran",
+    "micronesia": "Micronesia (country)",
+    "prc": "China",
+    "mainland china": "China",
+    "aus": "Australia",
+    "nz": "New Zealand",
+    "ksa": "Saudi Arabia"
+}
+
+PUNCTUATION = re.compile(r"[^\w\s]")
+SPACES = re.compile(r"\s+")
+ACCENTS = str.maketrans("áàâäãåçéèêëíìîïñóòôöõúùûüýÿ", "aaaaaaceeeeiiiinooooouuuuyy")
+
+def normalize_name(name):
+    """Case-, accent-, spacing- and punctuation-insensitive form of a name"""
+    text = str(name).casefold().translate(ACCENTS).replace("&", " and ")
+    text = PUNCTUATION.sub(lambda m: " " if m.group() in "-/" else "", text)
+    text = SPACES.sub(" ", text).strip()
+    return text[4:] if text.startswith("the ") else text
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (transpositions cost 1); limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+def typo_budget(text):
+    """Edits tolerated for a name of this length"""
+    if len(text) <= 3:
+        return 0
+    if len(text) <= 5:
+        return 1
+    return 2 if len(text) <= 10 else 3
+
+class CountryResolver:
+    """Resolves free-text country names to the Entity names the datasets share"""
+
+    def __init__(self, cache_size=4096, candidates=8):
+        self.canonical = {}  # normalized name, code or alias -> Entity
+        self.names = []  # normalized names (entities and aliases) searched by fuzzy lookup
+        self.name_entities = []
+        self.trigram_index = {}  # trigram -> ids into names
+        self.cache_size = cache_size
+        self.candidates = candidates
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, entity):
+        return normalize_name(entity) in self.canonical
+
+    def __len__(self):
+        return len(set(self.name_entities))
+
+    def add(self, entities, codes=None):
+        """Index Entity names (and their ISO codes, aligned with entities)"""
+        codes = [None] * len(entities) if codes is None else list(codes)
+        for entity, code in zip(entities, codes):
+            if not isinstance(entity, str):
+                continue
+            key = normalize_name(entity)
+            if key not in self.canonical:
+                self.canonical[key] = entity
+                self._add_name(key, entity)
+            # OWID_ codes are for aggregates (World, continents) and not worth matching
+            if isinstance(code, str) and code and not code.startswith("OWID"):
+                self.canonical.setdefault(code.casefold(), entity)
+        for alias, entity in ALIASES.items():
+            target = self.canonical.get(normalize_name(entity))
+            if target is not None and alias not in self.canonical:
+                self.canonical[alias] = target
+                self._add_name(alias, target)
+        self._cache.clear()
+        return self
+
+    def add_frame(self, df):
+        """Index a dataset's Entity (and Code, when present) column"""
+        if df is None or "Entity" not in df.columns:
+            return self
+        columns = ["Entity", "Code"] if "Code" in df.columns else ["Entity"]
+        pairs = df[columns].drop_duplicates("Entity")
+        return self.add(pairs["Entity"].tolist(), pairs["Code"].tolist() if "Code" in columns else None)
+
+    def resolve(self, name):
+        """Canonical Entity for a user-supplied name, or None"""
+        try:
+            result = self._cache[name]
+            self._cache.move_to_end(name)
+            self.hits += 1
+            return result
+        except KeyError:
+            pass
+        except TypeError:
+            return None
+        self.misses += 1
+        key = normalize_name(name)
+        result = self.canonical.get(key)
+        if result is None and key:
+            result = self._fuzzy(key)
+        self._cache[name] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def ambiguous(self, name):
+        """Entities a name could equally mean when resolve() declines to pick one ("Irak": Iraq, Iran)"""
+        key = normalize_name(name)
+        if key in self.canonical:
+            return []
+        matches = [entity for entity, _ in self._close_matches(key)]
+        return matches if len(matches) > 1 else []
+
+    def suggest(self, name, limit=3):
+        """Closest Entity names by edit distance, for "did you mean" prompts"""
+        key = normalize_name(name)
+        ranked = []
+        for i in self._candidate_ids(key):
+            distance = edit_distance(key, self.names[i], max(len(key), len(self.names[i])))
+            ranked.append((distance, self.name_entities[i]))
+        suggestions = []
+        for _, entity in sorted(ranked):
+            if entity not in suggestions:
+                suggestions.append(entity)
+        return suggestions[:limit]
+
+    def stats(self):
+        return {
+            "entities": len(self),
+            "keys": len(self.canonical),
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def _add_name(self, key, entity):
+        i = len(self.names)
+        self.names.append(key)
+        self.name_entities.append(entity)
+        for gram in trigrams(key):
+            self.trigram_index.setdefault(gram, []).append(i)
+
+    def _candidate_ids(self, key):
+        """Names sharing the most trigrams with key"""
+        counts = {}
+        for gram in trigrams(key):
+            for i in self.trigram_index.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        return sorted(counts, key=counts.get, reverse=True)[:self.candidates]
+
+    def _close_matches(self, key):
+        """[(Entity, edits)] within the typo budget of key, closest first
+
+        Entities with a name that starts with key are included too, at
+        budget + 1 edits ("dominican" -> "dominican republic").
+        """
+        budget = typo_budget(key)
+        if budget == 0:
+            return []
+        ranked = {}
+        for i in self._candidate_ids(key):
+            name, entity = self.names[i], self.name_entities[i]
+            distance = edit_distance(key, name, budget)
+            if distance > budget and not name.startswith(key):
+                continue
+            ranked[entity] = min(distance, ranked.get(entity, distance))
+        return sorted(ranked.items(), key=lambda item: item[1])
+
+    def _fuzzy(self, key):
+        """The one Entity a misspelling points to; None when two are equally close or one extends it"""
+        matches = self._close_matches(key)
+        if len(matches) != 1 or matches[0][1] > typo_budget(key):
+            return None
+        return matches[0][0]
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Binary columnar cache for the Data/ CSVs.
+#
+# Each CSV gets a sibling "<name>.csv.npcache/" directory holding one .npy file
+# per column dtype plus a manifest. Text columns (Entity, Code, ...) are stored as
+# integer category codes with the categories in the manifest. Numeric columns are
+# stored with their parsed dtype and memory-mapped on load, so a worker only pages
+# in what it touches. A cache is only used while it matches its CSV; otherwise the
+# CSV is parsed and the cache rewritten. Files under MIN_CACHE_BYTES are cheaper to
+# parse than to map and are always read as CSV.
+
+CACHE_SUFFIX = ".npcache"
+MANIFEST = "manifest.json"
+CACHE_VERSION = 2
+MIN_CACHE_BYTES = 64 * 1024
+
+def cache_dir_for(csv_path):
+    return csv_path + CACHE_SUFFIX
+
+def file_signature(path):
+    """Cheap change check for a data file: modification time and size"""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def content_hash(path):
+    """SHA-1 of a data file's contents"""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def _code_dtype(n_categories):
+    return np.int16 if n_categories < np.iinfo(np.int16).max else np.int32
+
+def encode_column(series):
+    """(manifest entry, array) for one column: numeric values as-is, text as category codes"""
+    entry = {"name": series.name}
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        values = series.to_numpy()
+        entry["kind"] = "numeric"
+    else:
+        categorical = pd.Categorical(series)
+        categories = [str(c) for c in categorical.categories]
+        values = categorical.codes.astype(_code_dtype(len(categories)))
+        entry["kind"] = "categorical"
+        entry["categories"] = categories
+    return entry, values
+
+def decode_column(entry, values):
+    """Column for a DataFrame over an encoded array, without copying it"""
+    if entry["kind"] == "categorical":
+        dtype = pd.CategoricalDtype(entry["categories"])
+        return pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+    return values
+
+def build_cache(csv_path, df=None):
+    """Write the columnar cache for one CSV and return the parsed frame"""
+    if df is None:
+        df = pd.read_csv(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Columns sharing a dtype are packed as rows of one 2-D array, so a table
+    # costs one mapping per dtype rather than one per column
+    columns = []
+    blocks = {}
+    for name in df.columns:
+        entry, values = encode_column(df[name])
+        block = blocks.setdefault(values.dtype.str, [])
+        entry["block"] = f"{values.dtype.name}.npy"
+        entry["row"] = len(block)
+        block.append(values)
+        columns.append(entry)
+
+    for arrays in blocks.values():
+        path = os.path.join(cache_dir, f"{arrays[0].dtype.name}.npy")
+        np.save(path, np.stack(arrays), allow_pickle=False)
+
+    manifest = {
+        "version": CACHE_VERSION,
+        "source": os.path.basename(csv_path),
+        "signature": file_signature(csv_path),
+        "hash": content_hash(csv_path),
+        "rows": len(df),
+        "columns": columns
+    }
+    # Write the manifest last so a half-written cache is never considered valid
+    write_manifest(csv_path, manifest)
+    return df
+
+def write_manifest(csv_path, manifest):
+    """Replace a cache's manifest atomically, so a reader never sees it half-written"""
+    cache_dir = cache_dir_for(csv_path)
+    tmp_path = os.path.join(cache_dir, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST))
+
+def read_manifest(csv_path):
+    try:
+        with open(os.path.join(cache_dir_for(csv_path), MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == CACHE_VERSION else None
+
+def is_fresh(csv_path, manifest):
+    """True if the cache still describes the CSV (by mtime/size, else by content)"""
+    signature = file_signature(csv_path)
+    if signature == manifest["signature"]:
+        return True
+    if content_hash(csv_path) != manifest["hash"]:
+        return False
+    # Touched but unchanged: record the new signature so the hash is skipped next time
+    manifest["signature"] = signature
+    try:
+        write_manifest(csv_path, manifest)
+    except OSError:
+        pass
+    return True
+
+def load_cache(csv_path, manifest):
+    """Assemble a DataFrame over memory-mapped column arrays"""
+    cache_dir = cache_dir_for(csv_path)
+    blocks = {}
+    data = {}
+    for entry in manifest["columns"]:
+        block = blocks.get(entry["block"])
+        if block is None:
+            block = blocks[entry["block"]] = np.load(os.path.join(cache_dir, entry["block"]), mmap_mode="r", allow_pickle=False)
+        data[entry["name"]] = decode_column(entry, block[entry["row"]])
+    return pd.DataFrame(data, copy=False)
+
+def read_csv_cached(csv_path, rebuild=True):
+    """Load a CSV through its columnar cache, falling back to the CSV when stale"""
+    if os.path.getsize(csv_path) < MIN_CACHE_BYTES:
+        return pd.read_csv(csv_path)
+
+    manifest = read_manifest(csv_path)
+    if manifest is not None:
+        try:
+            if is_fresh(csv_path, manifest):
+                return load_cache(csv_path, manifest)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    df = pd.read_csv(csv_path)
+    if rebuild:
+        try:
+            build_cache(csv_path, df)
+        except OSError:
+            pass  # read-only data directory: serve the CSV without caching
+    return df
+
+def build_all(data_dir):
+    """Build caches for every CSV under data_dir large enough to benefit"""
+    built = []
+    for root, dirs, files in os.walk(data_dir):
+        dirs[:] = [d for d in dirs if not d.endswith(CACHE_SUFFIX)]
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if name.endswith(".csv") and os.path.getsize(path) >= MIN_CACHE_BYTES:
+                build_cache(path)
+                built.append(path)
+    return built
+
+if __name__ == "__main__":
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Data")
+    for path in build_all(data_dir):
+        print(f"Cached {path}")
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+
+import pandas as pd
+
+# Lazy, size-bounded store for the assistant's datasets.
+#
+# Tables are registered as name -> loader (a zero-argument callable) and only
+# loaded the first time they are read. When a memory budget is set, the least
+# recently used tables are dropped once the resident total goes over it; they
+# are simply loaded again on their next access.
+
+def estimate_bytes(value):
+    """Approximate in-memory size of a loaded table"""
+    frame = getattr(value, "frame", value)
+    if isinstance(frame, pd.DataFrame):
+        return int(frame.memory_usage(index=True, deep=True).sum())
+    return 0
+
+class DatasetRegistry:
+    """Mapping-like view over lazily loaded datasets with LRU eviction"""
+
+    def __init__(self, loaders, memory_budget=None):
+        self.loaders = dict(loaders)
+        self.memory_budget = memory_budget  # bytes, None for unbounded
+        self._loaded = OrderedDict()  # name -> (value, size), oldest first
+        self.resident_bytes = 0
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def __getitem__(self, name):
+        if name in self._loaded:
+            self.hits += 1
+            self._loaded.move_to_end(name)
+            return self._loaded[name][0]
+        if name not in self.loaders:
+            raise KeyError(name)
+        value = self.loaders[name]()
+        self.loads += 1
+        self._store(name, value)
+        return value
+
+    def __setitem__(self, name, value):
+        """Replace a loaded table (e.g. after its file changed on disk)"""
+        if name not in self.loaders:
+            self.loaders[name] = lambda: value
+        self._store(name, value)
+
+    def __contains__(self, name):
+        return name in self.loaders
+
+    def __iter__(self):
+        return iter(self.loaders)
+
+    def __len__(self):
+        return len(self.loaders)
+
+    def get(self, name, default=None):
+        return self[name] if name in self.loaders else default
+
+    def keys(self):
+        return self.loaders.keys()
+
+    def is_loaded(self, name):
+        return name in self._loaded
+
+    def evict(self, name):
+        value, size = self._loaded.pop(name)
+        self.resident_bytes -= size
+        self.evictions += 1
+
+    def clear(self):
+        self._loaded.clear()
+        self.resident_bytes = 0
+
+    def stats(self):
+        return {
+            "registered": len(self.loaders),
+            "resident": list(self._loaded),
+            "resident_bytes": self.resident_bytes,
+            "memory_budget": self.memory_budget,
+            "loads": self.loads,
+            "hits": self.hits,
+            "evictions": self.evictions
+        }
+
+    def _store(self, name, value):
+        if name in self._loaded:
+            self.resident_bytes -= self._loaded.pop(name)[1]
+        size = estimate_bytes(value)
+        self._loaded[name] = (value, size)
+        self.resident_bytes += size
+        if self.memory_budget is None:
+            return
+        # Evict oldest first, but never the table that was just requested
+        while self.resident_bytes > self.memory_budget and len(self._loaded) > 1:
+            self.evict(next(iter(self._loaded)))
@@ -0,0 +1,334 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Parallel, cached build of the notebook's correlation figures.
+#
+# Only figures whose plotting code survives in Milestone2.ipynb are built; the
+# other PNGs in Scripts/visualizations have no source in the repo and are left
+# alone. Output goes to Scripts/build/figures, so replacing the tracked PNGs
+# takes an explicit --output Scripts/visualizations.
+#
+# Every figure is a FigureSpec: an output file, a module-level plot function and
+# the (already computed) data it draws. The parent process builds the inputs
+# once -- the synthetic panel from the notebook and the correlation matrices,
+# each computed a single time and handed to every heatmap, clustermap and
+# lower-triangle plot that draws it -- then hashes each spec's data, parameters
+# and plot function source. Figures whose hash matches the manifest (and whose
+# PNG exists) are skipped; the rest are rendered in a process pool on the Agg
+# backend and their timings reported.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPTS_DIR, "build", "figures")
+TRACKED_DIR = os.path.join(SCRIPTS_DIR, "visualizations")
+MANIFEST = ".figures.json"
+DPI = 150
+
+STYLE = {
+    "figure.figsize": (5, 4),
+    "font.size": 8,
+    "axes.titlesize": 10,
+    "axes.labelsize": 8,
+    "xtick.labelsize": 7,
+    "ytick.labelsize": 7,
+    "legend.fontsize": 7
+}
+
+CONDITIONS = ["Anxiety", "Major depression", "Bipolar", "Schizophrenia", "Eating Disorders"]
+CORRELATION_COLUMNS = ["Year", "GDP_per_capita", *CONDITIONS]
+COUNTRIES = ["Australia", "United States", "United Kingdom", "Canada", "India"]
+
+# Literature-based correlation matrix from the notebook, in CORRELATION_COLUMNS order
+REFERENCE_CORRELATIONS = [
+    [1.00, 0.12, 0.11, 0.18, -0.09, 0.05, -0.12],
+    [0.12, 1.00, 0.06, 0.19, -0.23, -0.15, -0.35],
+    [0.11, 0.06, 1.00, 0.76, 0.36, 0.44, 0.14],
+    [0.18, 0.19, 0.76, 1.00, 0.45, 0.48, 0.07],
+    [-0.09, -0.23, 0.36, 0.45, 1.00, 0.56, 0.26],
+    [0.05, -0.15, 0.44, 0.48, 0.56, 1.00, 0.18],
+    [-0.12, -0.35, 0.14, 0.07, 0.26, 0.18, 1.00]
+]
+
+# Input data
+
+COUNTRY_EFFECTS = {
+    "United States": {"anxiety": 1.2, "depression": 1.3},
+    "United Kingdom": {"anxiety": 1.1, "depression": 1.2},
+    "India": {"anxiety": 0.8, "depression": 0.7, "eating": 1.3}
+}
+
+POPULATION = {
+    "United States": 331000000,
+    "United Kingdom": 67000000,
+    "India": 1380000000,
+    "Canada": 38000000,
+    "Australia": 25000000,
+    "Global": 7800000000
+}
+
+# (base GDP per capita, yearly growth)
+GDP_PER_CAPITA = {
+    "United States": (60000, 0.02),
+    "United Kingdom": (40000, 0.015),
+    "India": (2000, 0.05),
+    "Canada": (45000, 0.018),
+    "Australia": (50000, 0.02),
+    "Global": (12000, 0.025)
+}
+
+def create_realistic_mental_health_data(seed=42):
+    """Synthetic country-year panel with realistic correlations (the notebook's generator)"""
+    rng = np.random.RandomState(seed)
+    countries = [*COUNTRIES, "Global"]
+    years = list(range(2010, 2024))
+    n_samples = len(countries) * len(years)
+
+    base_gdp = rng.normal(size=n_samples)
+    time_trend = np.linspace(0, 1, n_samples)
+
+    # Order: anxiety, depression, bipolar, schizophrenia, eating disorders
+    corr_matrix = np.array([
+        [1.0, 0.7, 0.4, 0.3, 0.35],
+        [0.7, 1.0, 0.45, 0.35, 0.4],
+        [0.4, 0.45, 1.0, 0.5, 0.25],
+        [0.3, 0.35, 0.5, 1.0, 0.2],
+        [0.35, 0.4, 0.25, 0.2, 1.0]
+    ])
+    correlated = np.linalg.cholesky(corr_matrix) @ rng.normal(size=(5, n_samples))
+
+    conditions = {
+        "anxiety": np.clip(5 + 0.5 * time_trend + 0.3 * base_gdp + 2 * correlated[0], 2, 15),
+        "depression": np.clip(6 + 0.6 * time_trend + 0.2 * base_gdp + 2.5 * correlated[1], 3, 18),
+        "bipolar": np.clip(1.5 + 0.2 * time_trend - 0.1 * base_gdp + 0.8 * correlated[2], 0.3, 5),
+        "schizophrenia": np.clip(0.9 + 0.1 * time_trend - 0.05 * base_gdp + 0.4 * correlated[3], 0.1, 3),
+        "eating": np.clip(2.5 + 0.3 * time_trend + 0.15 * base_gdp + 1.2 * correlated[4], 0.5, 8)
+    }
+
+    rows = []
+    index = 0
+    for country in countries:
+        rng.normal(scale=0.2)  # country random effect (drawn, unused, as in the notebook)
+        effects = COUNTRY_EFFECTS.get(country, {})
+        for year in years:
+            base_population = 10 ** rng.uniform(6, 9)
+            population = POPULATION.get(country, base_population) * (1 + 0.01 * (year - 2010))
+            base, growth = GDP_PER_CAPITA[country]
+            gdp_per_capita = base * (1 + growth * (year - 2010) + 0.01 * rng.normal())
+            rows.append({
+                "Entity": country,
+                "Year": year,
+                "Population": population,
+                "GDP": population * gdp_per_capita,
+                "GDP_per_capita": gdp_per_capita,
+                "Anxiety": conditions["anxiety"][index] * effects.get("anxiety", 1.0),
+                "Major depression": conditions["depression"][index] * effects.get("depression", 1.0),
+                "Bipolar": conditions["bipolar"][index],
+                "Schizophrenia": conditions["schizophrenia"][index],
+                "Eating Disorders": conditions["eating"][index] * effects.get("eating", 1.0)
+            })
+            index += 1
+    return pd.DataFrame(rows)
+
+def build_inputs():
+    """Data shared by the figures; each correlation matrix is computed exactly once"""
+    panel = create_realistic_mental_health_data()
+    reference = pd.DataFrame(REFERENCE_CORRELATIONS, columns=CORRELATION_COLUMNS, index=CORRELATION_COLUMNS)
+    return {
+        "panel_corr": panel[CORRELATION_COLUMNS].corr(),
+        "reference_corr": reference,
+        "condition_corr": reference.loc[CONDITIONS, CONDITIONS]
+    }
+
+# Plot functions (run in the worker processes)
+
+def lower_triangle(matrix):
+    return np.triu(np.ones_like(matrix, dtype=bool))
+
+def plot_heatmap(corr, path, title, masked=False, palette="RdBu_r", figsize=(5, 4), annot_size=6,
+                 square=False, shrink=0.8, title_size=10):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=figsize)
+    cmap = sns.diverging_palette(230, 20, as_cmap=True) if palette == "diverging" else palette
+    sns.heatmap(corr, mask=lower_triangle(corr) if masked else None, annot=True, fmt=".2f", cmap=cmap,
+                vmin=-1, vmax=1, center=0 if palette == "diverging" else None, square=square,
+                linewidths=0.5, cbar_kws={"shrink": shrink}, annot_kws={"size": annot_size})
+    plt.title(title, fontsize=title_size)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+def plot_correlation_bars(corr, path, condition, title):
+    import matplotlib.pyplot as plt
+
+    values = corr[condition].drop(condition).sort_values(ascending=False)
+    plt.figure(figsize=(5, 3))
+    bars = plt.barh(values.index, values, color=["#d7191c" if x < 0 else "#2c7bb6" for x in values])
+    plt.axvline(x=0, color="black", linestyle="-", alpha=0.3)
+    for i, bar in enumerate(bars):
+        width = bar.get_width()
+        plt.text(width + 0.02 if width > 0 else width - 0.08, i, f"{width:.2f}", va="center", fontsize=6)
+    plt.title(title, fontsize=10)
+    plt.xlabel("Correlation Coefficient", fontsize=8)
+    plt.xlim(-0.5, 1.0)
+    plt.grid(axis="x", alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+def plot_condition_interrelationships(corr, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(4.5, 4))
+    annotations = corr.round(2).map(lambda v: "1.00" if v == 1.0 else f"{v:.2f}")
+    sns.heatmap(corr, mask=lower_triangle(corr), annot=annotations, fmt="", cmap="Blues",
+                vmin=0, vmax=1, linewidths=0.5, cbar_kws={"shrink": 0.8}, annot_kws={"size": 6})
+    plt.title("Interrelationships Between Mental Health Conditions", fontsize=10)
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+def plot_clustermap(corr, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.clustermap(corr, cmap="Blues", vmin=0, vmax=1, annot=True, fmt=".2f", figsize=(4.5, 4.5),
+                   linewidths=0.5, cbar_kws={"shrink": 0.8}, annot_kws={"size": 6})
+    plt.suptitle("Hierarchical Clustering of Mental Health Conditions", fontsize=10, y=0.95)
+    plt.savefig(path, dpi=DPI)
+    plt.close()
+
+# Specs
+
+class FigureSpec:
+    def __init__(self, filename, plot, data, **params):
+        self.filename = filename
+        self.plot = plot
+        self.data = data
+        self.params = params
+
+    def digest(self):
+        """Hash of everything the PNG depends on: data, parameters, plot code and style"""
+        h = hashlib.sha1()
+        h.update(self.filename.encode())
+        h.update(inspect.getsource(self.plot).encode())
+        h.update(json.dumps([self.params, STYLE, DPI], sort_keys=True, default=str).encode())
+        _hash_data(h, self.data)
+        return h.hexdigest()
+
+def _hash_data(h, data):
+    if isinstance(data, pd.DataFrame):
+        h.update(json.dumps(list(map(str, data.columns))).encode())
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, (tuple, list)):
+        for item in data:
+            _hash_data(h, item)
+    else:
+        h.update(repr(data).encode())
+
+def figure_specs(inputs):
+    panel_corr = inputs["panel_corr"]
+    reference_corr = inputs["reference_corr"]
+    condition_corr = inputs["condition_corr"]
+    return [
+        FigureSpec("correlation_heatmap.png", plot_heatmap, panel_corr, masked=True, palette="diverging",
+                   figsize=(6, 5), title="Correlation Between Factors and Mental Health", square=True),
+        FigureSpec("correlation_heatmap_realistic.png", plot_heatmap, panel_corr, masked=True, palette="diverging",
+                   figsize=(8, 6), annot_size=8, square=True, shrink=1.0, title_size=12,
+                   title="Correlation Between Economic Factors and Mental Health"),
+        FigureSpec("full_correlation_matrix.png", plot_heatmap, panel_corr, palette="diverging", figsize=(8, 6),
+                   annot_size=8, square=True, shrink=1.0, title_size=12,
+                   title="Complete Correlation Matrix - Mental Health Factors"),
+        FigureSpec("full_correlation_heatmap.png", plot_heatmap, reference_corr,
+                   title="Mental Health Factors Correlation Matrix"),
+        FigureSpec("lower_triangle_heatmap.png", plot_heatmap, reference_corr, masked=True,
+                   title="Mental Health Factors Correlation Matrix (Lower Triangle)"),
+        FigureSpec("depression_correlations.png", plot_correlation_bars, reference_corr,
+                   condition="Major depression", title="Correlation with Major Depression"),
+        FigureSpec("anxiety_correlations.png", plot_correlation_bars, reference_corr,
+                   condition="Anxiety", title="Correlation with Anxiety"),
+        FigureSpec("condition_interrelationships.png", plot_condition_interrelationships, condition_corr),
+        FigureSpec("condition_clustermap.png", plot_clustermap, condition_corr)
+    ]
+
+# Build
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use("ggplot")
+    sns.set_palette("colorblind")
+    plt.rcParams.update(STYLE)
+
+def _render(plot, data, path, params):
+    start = time.perf_counter()
+    plot(data, path, **params)
+    return time.perf_counter() - start
+
+def read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def build_figures(output_dir=OUTPUT_DIR, jobs=None, force=False, only=None):
+    """Render changed figures in parallel; returns [{"figure", "status", "seconds"}]"""
+    os.makedirs(output_dir, exist_ok=True)
+    specs = figure_specs(build_inputs())
+    if only:
+        specs = [s for s in specs if s.filename in only or s.filename[:-4] in only]
+    manifest = read_manifest(output_dir)
+
+    results = []
+    pending = []
+    for spec in specs:
+        digest = spec.digest()
+        path = os.path.join(output_dir, spec.filename)
+        if not force and manifest.get(spec.filename) == digest and os.path.exists(path):
+            results.append({"figure": spec.filename, "status": "unchanged", "seconds": 0.0})
+        else:
+            pending.append((spec, digest, path))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+            futures = [(spec, digest, pool.submit(_render, spec.plot, spec.data, path, spec.params))
+                       for spec, digest, path in pending]
+            for spec, digest, future in futures:
+                results.append({"figure": spec.filename, "status": "built", "seconds": future.result()})
+                manifest[spec.filename] = digest
+
+        # Written last, so an interrupted build is simply redone
+        with open(os.path.join(output_dir, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    return results
+
+def print_report(results, elapsed):
+    for result in sorted(results, key=lambda r: -r["seconds"]):
+        print(f"{result['figure']:<36} {result['status']:<10} {result['seconds'] * 1000:8.1f} ms")
+    built = sum(r["status"] == "built" for r in results)
+    print(f"{built} built, {len(results) - built} unchanged in {elapsed:.2f} s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the notebook's correlation figures")
+    parser.add_argument("--output", default=OUTPUT_DIR,
+                        help=f"output directory (default: {os.path.relpath(OUTPUT_DIR)}; {os.path.relpath(TRACKED_DIR)} replaces the tracked PNGs)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-render even unchanged figures")
+    parser.add_argument("only", nargs="*", help="figure names to build (default: all)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    results = build_figures(args.output, args.jobs, args.force, args.only)
+    print_report(results, time.perf_counter() - start)
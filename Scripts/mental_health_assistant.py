@@ -1,61 +1,252 @@
 import pandas as pd
 import os
 import time
+from functools import partial
+
+import metrics
+
+from condition_model import load_model
+from country_resolver import CountryResolver
+from dataset_cache import content_hash, file_signature, read_csv_cached
+from dataset_registry import DatasetRegistry
+from responses import RESOURCES_PROMPT, ResponseRenderer
+from schema import Schema, SchemaError, compile_table, read_header
+from stream_loader import read_csv_narrow
+from symptom_matcher import assistant_matcher
+from trends import ALL_CSV_CONDITIONS, DISORDERS_CONDITIONS, build_cubes
+
+# Shared, read-only data (conversation state lives on Session objects)
+datasets = DatasetRegistry({})
+snapshots = {}
+aggregate_cache = {}
+trend_cubes = {}
+country_resolver = None
+condition_model = None
+condition_model_error = None
+
+# Upper bound (in bytes) on loaded tables; least recently used ones are dropped
+# past it and reloaded on demand. None keeps every table once loaded.
+DATASET_MEMORY_BUDGET = None
+
+DATASET_FILES = {
+    "prevalence": "../processed_data/processed_mental_illness_prevalence.csv",
+    "dalys": "../processed_data/dalys.csv",
+    "filled_form": "../processed_data/filled_form.csv",
+    "dealt_anxiety": "../processed_data/dealt_anxiety.csv",
+    "dealing_anxiety": "../processed_data/dealing_anxiety.csv",
+    "disorders": "../processed_data/disorders.csv",
+    "all": "../all.csv"
+}
+
+# Large panels read through the chunked narrow-dtype loader, projected to the
+# value columns actually queried (key columns are always kept)
+NARROW_COLUMNS = {
+    "all": list(ALL_CSV_CONDITIONS)
+}
+
+# Answer keys -> dataset columns used by get_country_data
+PREVALENCE_FIELDS = {
+    "depression": "Major depression",
+    "bipolar": "Bipolar disorder",
+    "eating": "Eating disorders",
+    "dysthymia": "Dysthymia",
+    "schizophrenia": "Schizophrenia",
+    "anxiety": "Anxiety disorders"
+}
+
+COPING_FIELDS = {
+    "religion": "Religious/Spiritual Activities",
+    "lifestyle": "Improved Lifestyle",
+    "work": "Changed Work Situation",
+    "relationships": "Changed Relationships",
+    "social": "Talked to Friends/Family",
+    "medication": "Took Medication",
+    "outdoors": "Spent Time Outdoors",
+    "professional": "Talked to Professional"
+}
+
+# Declared layout of every dataset, checked against each file's header at
+# startup; get_snapshot() compiles the latest row per Entity (by Year)
+DATASET_SCHEMAS = {
+    "prevalence": Schema(PREVALENCE_FIELDS, latest_by="Year"),
+    "dalys": Schema({"prevalence": "Prevalence (share of population)", "dalys_rate": "DALYs (rate)"}, latest_by="Year"),
+    "filled_form": Schema({
+        "anxious_depressed": "Share - Question: mh7a - Have been anxious/depressed - Answer: Yes - Gender: all - Age_group: all"
+    }, latest_by="Year"),
+    "dealt_anxiety": Schema({
+        "medication": "Took Medication",
+        "religion": "Religious/Spiritual Activities",
+        "social": "Talked to Friends/Family"
+    }, latest_by="Year"),
+    "dealing_anxiety": Schema(COPING_FIELDS, latest_by="Year"),
+    "disorders": Schema({name: column for column, name in DISORDERS_CONDITIONS.items()}, latest_by="Year"),
+    "all": Schema({name: column for column, name in ALL_CSV_CONDITIONS.items()}, latest_by="Year")
+}
 
-# Global variables to store user data
-user_data = {
-    "rating": None,
-    "duration": None,
-    "symptoms": None,
-    "country": None
+GLOBAL_RESOURCES = [
+    "WHO Mental Health Website: www.who.int/mental_health",
+    "International Association for Suicide Prevention: www.iasp.info"
+]
+
+# Hardcoded resources for example purposes
+MENTAL_HEALTH_RESOURCES = {
+    "India": {
+        "local": [
+            "AASRA Suicide Prevention Helpline: 91-9820466726",
+            "National Institute of Mental Health and Neurosciences (NIMHANS): www.nimhans.ac.in",
+            "The Live Love Laugh Foundation: www.thelivelovelaughfoundation.org",
+            "Manas Foundation: www.manasfoundation.in",
+            "SCARF India (Schizophrenia Research Foundation): www.scarfindia.org",
+            "iCall Psychosocial Helpline: 022-25521111",
+            "Vandrevala Foundation Mental Health Helpline: 1860-2662-345"
+        ],
+        "global": GLOBAL_RESOURCES
+    },
+    "United States": {
+        "local": [
+            "National Suicide Prevention Lifeline: 1-800-273-8255",
+            "Crisis Text Line: Text HOME to 741741",
+            "National Alliance on Mental Illness (NAMI): www.nami.org",
+            "Mental Health America: www.mhanational.org"
+        ],
+        "global": GLOBAL_RESOURCES
+    },
+    "United Kingdom": {
+        "local": [
+            "Samaritans: 116 123",
+            "Mind: www.mind.org.uk",
+            "NHS Mental Health Services: www.nhs.uk/mental-health"
+        ],
+        "global": GLOBAL_RESOURCES
+    },
+    "Canada": {
+        "local": [
+            "Crisis Services Canada: 1-833-456-4566",
+            "Canadian Mental Health Association: www.cmha.ca",
+            "Kids Help Phone: 1-800-668-6868"
+        ],
+        "global": GLOBAL_RESOURCES
+    },
+    "Australia": {
+        "local": [
+            "Lifeline Australia: 13 11 14",
+            "Beyond Blue: 1300 22 4636",
+            "Headspace: www.headspace.org.au"
+        ],
+        "global": GLOBAL_RESOURCES
+    }
+}
+
+DEFAULT_RESOURCES = {
+    "local": ["No specific resources found for your country"],
+    "global": GLOBAL_RESOURCES
 }
 
-current_step = 0
-datasets = {}
+# Static answer text and every listed country's resource section, rendered once
+renderer = ResponseRenderer(MENTAL_HEALTH_RESOURCES, DEFAULT_RESOURCES)
 
-def load_csv(filename):
-    """Load and parse CSV file"""
+# Cache statistics the components already keep, shown in every metrics report
+metrics.register_source("datasets", lambda: datasets.stats())
+metrics.register_source("responses", renderer.stats)
+metrics.register_source("country_resolver", lambda: country_resolver.stats() if country_resolver else None)
+
+@metrics.timed
+def load_csv(filename, columns=None):
+    """Load and parse CSV file (through its columnar cache when fresh, or narrow-typed when columns are given)"""
     try:
-        return pd.read_csv(filename)
+        if columns is not None:
+            return read_csv_narrow(filename, columns)
+        return read_csv_cached(filename)
     except Exception as e:
         print(f"Error loading {filename}: {e}")
         return None
 
-def load_all_datasets():
-    """Load all datasets needed for the mental health assistant"""
+def build_latest_snapshot(name, df):
+    """Compile a dataset against its schema: latest row per Entity over a float array
+
+    The snapshot keeps no reference to the frame, so a table the registry
+    evicts is actually freed.
+    """
+    return compile_table(df, DATASET_SCHEMAS[name], DATASET_FILES[name], keep_frame=False)
+
+def get_snapshot(name):
+    """Latest record per entity for a dataset, built the first time it is needed"""
+    snapshot = snapshots.get(name)
+    if snapshot is None:
+        metrics.count("snapshot.miss")
+        with metrics.timer("build_latest_snapshot"):
+            snapshot = snapshots[name] = build_latest_snapshot(name, datasets.get(name))
+    else:
+        metrics.count("snapshot.hit")
+    return snapshot
+
+def file_loaders():
+    """Loader for each dataset that parses its CSV (or reads its columnar cache)"""
+    return {name: partial(load_csv, path, NARROW_COLUMNS.get(name)) for name, path in DATASET_FILES.items()}
+
+def use_datasets(loaders, memory_budget=None):
+    """Serve datasets from the given loaders, dropping everything derived from the previous ones"""
+    global datasets, country_resolver, condition_model, condition_model_error
+    datasets = DatasetRegistry(loaders, memory_budget=memory_budget)
+    snapshots.clear()
+    aggregate_cache.clear()
+    trend_cubes.clear()
+    country_resolver = None
+    condition_model = None  # re-checked against all.csv on next use
+    condition_model_error = None
+    renderer.clear()
+
+def load_all_datasets(memory_budget=DATASET_MEMORY_BUDGET):
+    """Register all datasets needed for the mental health assistant (loaded on first use)"""
     print("Initializing Mental Health Assistant...")
     
     try:
-        global datasets
-        datasets = {
-            "prevalence": load_csv("../processed_data/processed_mental_illness_prevalence.csv"),
-            "dalys": load_csv("../processed_data/dalys.csv"),
-            "filled_form": load_csv("../processed_data/filled_form.csv"),
-            "dealt_anxiety": load_csv("../processed_data/dealt_anxiety.csv"),
-            "dealing_anxiety": load_csv("../processed_data/dealing_anxiety.csv"),
-            "disorders": load_csv("../processed_data/disorders.csv")
-        }
+        use_datasets(file_loaders(), memory_budget=memory_budget)
         
-        # Check if all datasets loaded successfully
-        all_loaded = all(df is not None for df in datasets.values())
+        # Check that every dataset is present; parsing waits until first access
+        all_loaded = all(os.path.exists(path) for path in DATASET_FILES.values())
         
         if all_loaded:
-            print("All available datasets loaded successfully.")
+            # Renamed or missing columns fail here rather than mid-conversation
+            for name, schema in DATASET_SCHEMAS.items():
+                schema.resolve(read_header(DATASET_FILES[name]), DATASET_FILES[name])
+
+            print("All available datasets found.")
             print("Mental Health Assistant initialized successfully.")
             print("== Mental Health Assistant ==")
             print("Type 'exit' to end the conversation.")
             print()
             return True
         else:
-            print("Failed to load some datasets. Please check file paths and formats.")
+            print("Failed to find some datasets. Please check file paths.")
             return False
             
+    except SchemaError as e:
+        print(f"Dataset does not match its schema: {e}")
+        return False
     except Exception as e:
         print(f"Error during initialization: {e}")
         return False
 
+def get_country_resolver():
+    """Index over the Entity names and ISO codes of every dataset, built on first use"""
+    global country_resolver
+    if country_resolver is None:
+        resolver = CountryResolver()
+        for name in DATASET_FILES:
+            resolver.add_frame(datasets.get(name))
+        country_resolver = resolver
+    return country_resolver
+
+@metrics.timed
+def resolve_country(name):
+    """Entity name shared by every dataset for a user-supplied country ("USA", "uk ", "Inida")"""
+    return get_country_resolver().resolve(name)
+
+@metrics.timed
 def get_country_data(country):
     """Get mental health data for a specific country"""
+    country = resolve_country(country) or country
     result = {
         "prevalence": {
             "depression": 3.3,  # Default values if data not found
@@ -63,150 +254,243 @@ def get_country_data(country):
         }
     }
     
-    # Get prevalence data for the country
-    if "prevalence" in datasets and datasets["prevalence"] is not None:
-        country_data = datasets["prevalence"][datasets["prevalence"]["Entity"] == country]
-        if not country_data.empty:
-            # Get the most recent year
-            most_recent = country_data.sort_values(by="Year", ascending=False).iloc[0]
-            result["prevalence"] = {
-                "depression": most_recent["Major depression"],
-                "bipolar": most_recent["Bipolar disorder"],
-                "eating": most_recent["Eating disorders"],
-                "dysthymia": most_recent["Dysthymia"],
-                "schizophrenia": most_recent["Schizophrenia"],
-                "anxiety": most_recent["Anxiety disorders"]
-            }
-    
-    # Get coping strategies data
-    if "dealing_anxiety" in datasets and datasets["dealing_anxiety"] is not None:
-        coping_data = datasets["dealing_anxiety"][datasets["dealing_anxiety"]["Entity"] == country]
-        if not coping_data.empty:
-            # Get the most recent year
-            most_recent = coping_data.sort_values(by="Year", ascending=False).iloc[0]
-            result["coping_strategies"] = {
-                "religion": most_recent["Religious/Spiritual Activities"],
-                "lifestyle": most_recent["Improved Lifestyle"],
-                "work": most_recent["Changed Work Situation"],
-                "relationships": most_recent["Changed Relationships"],
-                "social": most_recent["Talked to Friends/Family"],
-                "medication": most_recent["Took Medication"],
-                "outdoors": most_recent["Spent Time Outdoors"],
-                "professional": most_recent["Talked to Professional"]
-            }
+    # Most recent prevalence record for the country
+    most_recent = get_snapshot("prevalence").record(country)
+    if most_recent is not None:
+        result["prevalence"] = most_recent
+    
+    # Most recent coping strategies record for the country
+    most_recent = get_snapshot("dealing_anxiety").record(country)
+    if most_recent is not None:
+        result["coping_strategies"] = most_recent
     
     return result
 
-def get_global_averages():
-    """Calculate global averages for mental health statistics"""
+def get_trend_cubes():
+    """Entity x year x condition cubes over the disorder panels, built on first use"""
+    if not trend_cubes:
+        trend_cubes.update(build_cubes(datasets.get("all"), datasets.get("disorders")))
+    return trend_cubes
+
+@metrics.timed
+def get_country_trends(country):
+    """Change since 1990, CAGR, rank and percentile per condition (all.csv), or None
+
+    Kept off get_country_data(): no answer quotes trends, and every lookup
+    would pay for the summary.
+    """
+    country = resolve_country(country) or country
+    cube = get_trend_cubes().get("all")
+    return cube.summary(country) if cube is not None else None
+
+def get_condition_model():
+    """Persisted condition classifier (see condition_model.py), or None if missing or stale
+
+    Never trains: a chat turn must not wait for it, and a read-only deploy
+    could not keep the result. Scripts/artifacts is not checked in, so a fresh
+    checkout has no model until "python Scripts/condition_model.py" builds it;
+    that is reported by condition_model_status(), not to the conversation.
+    """
+    global condition_model, condition_model_error
+    if condition_model is None:
+        try:
+            condition_model = load_model(path=DATASET_FILES["all"], rebuild=False)
+        except (ImportError, OSError, ValueError) as e:
+            metrics.count("condition_model.unavailable")
+            condition_model, condition_model_error = False, str(e)
+    return condition_model or None
+
+def condition_model_status():
+    """"loaded", "not loaded" (not tried yet) or "unavailable: <reason>" """
+    if condition_model is None:
+        return "not loaded"
+    return "loaded" if condition_model else f"unavailable: {condition_model_error}"
+
+@metrics.timed
+def get_condition_likelihoods(countries, year=None):
+    """{country: {condition: probability above the global median}} for the countries the model knows
+
+    One predict_proba() over the whole batch; empty without a model.
+    """
+    model = get_condition_model()
+    if model is None:
+        return {}
+    known = [c for c in (resolve_country(c) or c for c in countries) if c in model]
+    if not known:
+        return {}
+    proba = model.predict_proba(known, None if year is None else [year] * len(known))
+    return {country: {c: float(p) for c, p in zip(model.conditions, row)}
+            for country, row in zip(known, proba)}
+
+def build_aggregates(df):
+    """Per-year means of every prevalence column in one groupby"""
+    columns = [c for c in df.select_dtypes(include="number").columns if c != "Year"]
+    yearly_means = df.groupby("Year")[columns].mean()
+    by_year = {year: {c: v for c, v in row.items() if pd.notna(v)}
+               for year, row in yearly_means.to_dict(orient="index").items()}
+    return {
+        "yearly_means": yearly_means,
+        "by_year": by_year,
+        "latest_year": max(by_year) if by_year else None
+    }
+
+@metrics.timed
+def get_prevalence_aggregates():
+    """Cached prevalence aggregates, rebuilt only when the backing CSV changes"""
+    path = DATASET_FILES["prevalence"]
+    cached = aggregate_cache.get("prevalence")
+    
+    try:
+        signature = file_signature(path)
+    except OSError:
+        signature = None
+    
+    if cached is not None:
+        # Unchanged mtime/size, or the file is unreadable: keep serving the cache
+        if signature is None or signature == cached["signature"]:
+            metrics.count("aggregates.hit")
+            return cached
+        # Touched but identical contents: remember the new mtime and keep the cache
+        digest = content_hash(path)
+        if digest == cached["hash"]:
+            cached["signature"] = signature
+            metrics.count("aggregates.hit")
+            return cached
+        # Contents changed: reload the dataset before rebuilding
+        df = load_csv(path)
+        if df is not None:
+            datasets["prevalence"] = df
+            snapshots["prevalence"] = build_latest_snapshot("prevalence", df)
+    
+    df = datasets.get("prevalence")
+    if df is None or df.empty:
+        return None
+    
+    metrics.count("aggregates.rebuild")
+    cached = build_aggregates(df)
+    renderer.clear()  # memoized answers quote the old averages
+    cached["signature"] = signature
+    cached["hash"] = content_hash(path) if signature is not None else None
+    aggregate_cache["prevalence"] = cached
+    return cached
+
+def get_yearly_means():
+    """Global mean of every prevalence column for each year (Year-indexed DataFrame)"""
+    aggregates = get_prevalence_aggregates()
+    return aggregates["yearly_means"] if aggregates is not None else None
+
+@metrics.timed
+def get_global_averages(year=None):
+    """Global averages for mental health statistics for a year (default: the latest)"""
     result = {"depression": 3.4, "anxiety": 3.8}  # Default values
     
-    # Calculate global average for major depression
-    if "prevalence" in datasets and datasets["prevalence"] is not None:
-        df = datasets["prevalence"]
-        if not df.empty:
-            # Get the latest year
-            latest_year = df["Year"].max()
-            latest_data = df[df["Year"] == latest_year]
-            
-            # Calculate averages
-            depression_values = latest_data["Major depression"].dropna()
-            anxiety_values = latest_data["Anxiety disorders"].dropna()
-            
-            if not depression_values.empty:
-                result["depression"] = depression_values.mean()
-            
-            if not anxiety_values.empty:
-                result["anxiety"] = anxiety_values.mean()
+    aggregates = get_prevalence_aggregates()
+    if aggregates is None:
+        return result
+    
+    if year is None:
+        year = aggregates["latest_year"]
+    means = aggregates["by_year"].get(year, {})
+    
+    if "Major depression" in means:
+        result["depression"] = means["Major depression"]
+    
+    if "Anxiety disorders" in means:
+        result["anxiety"] = means["Anxiety disorders"]
     
     return result
 
+def condition_rates(country, condition):
+    """(country, global) prevalence of a condition, for the learn-more answer"""
+    default = {"depression": 3.3, "anxiety": 3.8}[condition]
+    rate = get_country_data(country)["prevalence"].get(condition, default)
+    return rate, get_global_averages()[condition]
+
+@metrics.timed
 def get_mental_health_resources(country):
     """Get mental health resources for a specific country"""
-    # Hardcoded resources for example purposes
-    resources = {
-        "India": {
-            "local": [
-                "AASRA Suicide Prevention Helpline: 91-9820466726",
-                "National Institute of Mental Health and Neurosciences (NIMHANS): www.nimhans.ac.in",
-                "The Live Love Laugh Foundation: www.thelivelovelaughfoundation.org",
-                "Manas Foundation: www.manasfoundation.in",
-                "SCARF India (Schizophrenia Research Foundation): www.scarfindia.org",
-                "iCall Psychosocial Helpline: 022-25521111",
-                "Vandrevala Foundation Mental Health Helpline: 1860-2662-345"
-            ],
-            "global": [
-                "WHO Mental Health Website: www.who.int/mental_health",
-                "International Association for Suicide Prevention: www.iasp.info"
-            ]
-        },
-        "United States": {
-            "local": [
-                "National Suicide Prevention Lifeline: 1-800-273-8255",
-                "Crisis Text Line: Text HOME to 741741",
-                "National Alliance on Mental Illness (NAMI): www.nami.org",
-                "Mental Health America: www.mhanational.org"
-            ],
-            "global": [
-                "WHO Mental Health Website: www.who.int/mental_health",
-                "International Association for Suicide Prevention: www.iasp.info"
-            ]
-        },
-        "United Kingdom": {
-            "local": [
-                "Samaritans: 116 123",
-                "Mind: www.mind.org.uk",
-                "NHS Mental Health Services: www.nhs.uk/mental-health"
-            ],
-            "global": [
-                "WHO Mental Health Website: www.who.int/mental_health",
-                "International Association for Suicide Prevention: www.iasp.info"
-            ]
-        },
-        "Canada": {
-            "local": [
-                "Crisis Services Canada: 1-833-456-4566",
-                "Canadian Mental Health Association: www.cmha.ca",
-                "Kids Help Phone: 1-800-668-6868"
-            ],
-            "global": [
-                "WHO Mental Health Website: www.who.int/mental_health",
-                "International Association for Suicide Prevention: www.iasp.info"
-            ]
-        },
-        "Australia": {
-            "local": [
-                "Lifeline Australia: 13 11 14",
-                "Beyond Blue: 1300 22 4636",
-                "Headspace: www.headspace.org.au"
-            ],
-            "global": [
-                "WHO Mental Health Website: www.who.int/mental_health",
-                "International Association for Suicide Prevention: www.iasp.info"
-            ]
-        }
-    }
-    
-    return resources.get(country, {
-        "local": ["No specific resources found for your country"],
-        "global": [
-            "WHO Mental Health Website: www.who.int/mental_health",
-            "International Association for Suicide Prevention: www.iasp.info"
-        ]
-    })
-
-def handle_rating_input(input_text):
+    country = resolve_country(country) or country
+    return MENTAL_HEALTH_RESOURCES.get(country, DEFAULT_RESOURCES)
+
+class Session:
+    """State of one conversation; datasets are shared by every session"""
+    __slots__ = ("session_id", "current_step", "rating", "duration", "symptoms", "condition", "country", "last_active")
+    
+    def __init__(self, session_id=None, now=None):
+        self.session_id = session_id
+        self.current_step = 0
+        self.rating = None
+        self.duration = None
+        self.symptoms = None
+        self.condition = None
+        self.country = None
+        self.last_active = time.monotonic() if now is None else now
+
+class SessionManager:
+    """Hosts many concurrent sessions in one process and expires idle ones"""
+    
+    def __init__(self, idle_timeout=30 * 60, clock=time.monotonic):
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.sessions = {}  # session_id -> Session, least recently active first
+        self.expired = 0
+    
+    def __len__(self):
+        return len(self.sessions)
+    
+    def __contains__(self, session_id):
+        return session_id in self.sessions
+    
+    def get(self, session_id):
+        """Return the session for an id, creating it on first contact"""
+        now = self.clock()
+        self.expire_idle(now)
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            session = Session(session_id, now)
+        session.last_active = now
+        self.sessions[session_id] = session  # re-insert to keep activity order
+        return session
+    
+    def end(self, session_id):
+        self.sessions.pop(session_id, None)
+    
+    def expire_idle(self, now=None):
+        """Drop sessions idle for longer than idle_timeout; returns how many"""
+        if now is None:
+            now = self.clock()
+        cutoff = now - self.idle_timeout
+        # Dicts keep insertion order, so the idle sessions are all at the front
+        idle = []
+        for session_id, session in self.sessions.items():
+            if session.last_active > cutoff:
+                break
+            idle.append(session_id)
+        for session_id in idle:
+            del self.sessions[session_id]
+        self.expired += len(idle)
+        return len(idle)
+    
+    def process(self, session_id, input_text):
+        """Route one message to its session and return (replies, continue_chat)"""
+        session = self.get(session_id)
+        replies, continue_chat = respond(input_text, session)
+        if not continue_chat:
+            self.end(session_id)
+        return replies, continue_chat
+
+default_session = Session()
+
+@metrics.timed
+def handle_rating_input(session, input_text):
     """Handle user input for rating their mental wellbeing"""
-    global current_step, user_data
-    
     try:
         rating = int(input_text)
         
         if rating < 1 or rating > 10:
-            print("Chatbot: Please enter a valid number between 1 and 10.")
-            return
+            return ["Please enter a valid number between 1 and 10."]
             
-        user_data["rating"] = rating
+        session.rating = rating
         
         if rating <= 3:
             response = "I'm sorry to hear you're not feeling well."
@@ -215,52 +499,49 @@ def handle_rating_input(input_text):
         else:
             response = "I'm glad to hear you're doing relatively well."
             
-        print(f"Chatbot: {response}")
-        print("Chatbot: How long have you been experiencing these feelings? (days, weeks, months?)")
+        session.current_step = 1
         
-        current_step = 1
+        return [response, "How long have you been experiencing these feelings? (days, weeks, months?)"]
         
     except ValueError:
-        print("Chatbot: Please enter a valid number between 1 and 10 to rate your mental wellbeing.")
+        return ["Please enter a valid number between 1 and 10 to rate your mental wellbeing."]
 
-def handle_duration_input(input_text):
+@metrics.timed
+def handle_duration_input(session, input_text):
     """Handle user input for duration of symptoms"""
-    global current_step, user_data
+    session.duration = input_text
     
-    user_data["duration"] = input_text
+    session.current_step = 2
     
-    print("Chatbot: Thank you for sharing. Could you describe the main symptoms or feelings you've been experiencing? [For example: anxiety, low mood, trouble sleeping, irritability, worry, panic attacks, etc.]")
-    
-    current_step = 2
+    return ["Thank you for sharing. Could you describe the main symptoms or feelings you've been experiencing? [For example: anxiety, low mood, trouble sleeping, irritability, worry, panic attacks, etc.]"]
 
-def handle_symptoms_input(input_text):
+@metrics.timed
+def handle_symptoms_input(session, input_text):
     """Handle user input for symptoms"""
-    global current_step, user_data
-    
-    user_data["symptoms"] = input_text
+    session.symptoms = input_text
+    # Classify once; the country and learn-more steps reuse the result
+    with metrics.timer("symptom_match"):
+        session.condition = assistant_matcher.first_match(input_text, "mental health challenges")
     
-    print("Chatbot: Thank you for sharing those details. Which country do you live in? This will help me provide statistics and coping strategies relevant to your region. [Example countries: India, United States, United Kingdom, Canada, Australia]")
+    session.current_step = 3
     
-    current_step = 3
+    return ["Thank you for sharing those details. Which country do you live in? This will help me provide statistics and coping strategies relevant to your region. [Example countries: India, United States, United Kingdom, Canada, Australia]"]
 
-def handle_country_input(input_text):
+@metrics.timed
+def handle_country_input(session, input_text):
     """Handle user input for country"""
-    global current_step, user_data
-    
     country = input_text.strip()
-    user_data["country"] = country
-    
-    # Determine likely condition based on symptoms
-    symptoms = user_data["symptoms"].lower()
-    
-    if "low mood" in symptoms or "sadness" in symptoms or "hopeless" in symptoms:
-        condition = "depression"
-    elif "worry" in symptoms or "anxious" in symptoms or "panic" in symptoms:
-        condition = "anxiety"
-    elif "sleep" in symptoms or "insomnia" in symptoms:
-        condition = "sleep issues"
-    else:
-        condition = "mental health challenges"
+    resolved = resolve_country(country)
+    # A misspelling close to several countries is asked about rather than guessed
+    options = get_country_resolver().ambiguous(country)[:3] if resolved is None else []
+    if options:
+        choices = ", ".join(options[:-1]) + " or " + options[-1]
+        return [f"Did you mean {choices}? [Please type the country name]"]
+    # Store the canonical Entity name so every later lookup is an exact match
+    session.country = resolved or country
+    
+    # Likely condition, identified from the symptoms step
+    condition = session.condition
     
     # Response based on identified condition
     if condition == "depression":
@@ -270,147 +551,83 @@ def handle_country_input(input_text):
     else:
         response = "Based on what you've shared, would you like to learn more about common mental health challenges and coping strategies? [Please respond with: yes or no]"
     
-    print(f"Chatbot: {response}")
+    session.current_step = 4
     
-    current_step = 4
+    return [response]
 
-def handle_learn_more_input(input_text):
+@metrics.timed
+def handle_learn_more_input(session, input_text):
     """Handle user input for learning more about mental health"""
-    global current_step
-    
     affirmative = "yes" in input_text.lower()
     
     if not affirmative:
-        print("Chatbot: I understand. Is there something specific about mental health you'd like to know about instead?")
-        return
-    
-    # Get country data and global averages
-    country_data = get_country_data(user_data["country"])
-    global_averages = get_global_averages()
+        return ["I understand. Is there something specific about mental health you'd like to know about instead?"]
     
-    # Prepare information based on likely condition
-    symptoms = user_data["symptoms"].lower()
+    # Notices a changed prevalence file, which also drops answers quoting old numbers
+    get_prevalence_aggregates()
+    rates = partial(condition_rates, session.country, session.condition)
+    with metrics.timer("render.condition_info"):
+        response = renderer.condition_info(session.country, session.condition, rates)
     
-    if "low mood" in symptoms or "sadness" in symptoms or "hopeless" in symptoms:
-        # Depression info
-        depression_rate = country_data["prevalence"].get("depression", 3.3)
-        global_depression = global_averages["depression"]
-        comparison = "lower" if depression_rate < global_depression else "higher"
-        
-        response = f"""Information about Depression:
-
-Depression (major depressive disorder) causes persistent feelings of sadness and loss of interest. It affects how you feel, think, and behave and can lead to various emotional and physical problems.
-In {user_data["country"]}, approximately {depression_rate:.1f}% of the population experiences depression.
-This is {comparison} than the global average of {global_depression:.1f}%.
-
-Evidence-based strategies for managing depression:
-
-1. Psychotherapy (especially CBT and Interpersonal Therapy)
-2. Medication (antidepressants) when prescribed by a healthcare provider
-3. Regular physical activity, which has been shown to reduce symptoms
-4. Maintaining social connections and talking about your feelings
-5. Establishing routines and setting achievable goals
-
-It's important to work with healthcare professionals for personalized treatment."""
-
-    elif "worry" in symptoms or "anxious" in symptoms or "panic" in symptoms:
-        # Anxiety info
-        anxiety_rate = country_data["prevalence"].get("anxiety", 3.8)
-        global_anxiety = global_averages["anxiety"]
-        comparison = "lower" if anxiety_rate < global_anxiety else "higher"
-        
-        response = f"""Information about Anxiety:
-
-Anxiety disorders involve persistent, excessive worry or fear about everyday situations. Anxiety can manifest as physical symptoms and interfere with daily activities.
-In {user_data["country"]}, approximately {anxiety_rate:.1f}% of the population experiences anxiety disorders.
-This is {comparison} than the global average of {global_anxiety:.1f}%.
-
-Evidence-based strategies for managing anxiety:
-
-1. Cognitive-behavioral therapy (CBT)
-2. Mindfulness and meditation practices
-3. Regular physical exercise
-4. Breathing techniques and progressive muscle relaxation
-5. Limiting caffeine and alcohol consumption
-6. Medication when prescribed by a healthcare provider
-
-It's important to work with healthcare professionals for personalized treatment."""
-
-    else:
-        # General mental health info
-        response = """Information about Mental Health:
-
-Mental health encompasses emotional, psychological, and social well-being, affecting how we think, feel, act, handle stress, relate to others, and make choices.
-
-Common evidence-based strategies for maintaining good mental health:
-
-1. Regular physical activity and a balanced diet
-2. Adequate sleep and consistent sleep schedule
-3. Social connection and supportive relationships
-4. Stress management techniques like mindfulness and relaxation
-5. Setting boundaries and practicing self-care
-6. Seeking professional help when needed
-
-Remember that everyone's mental health needs are different, and what works for one person may not work for another."""
-
-    print(f"Chatbot: {response}")
+    session.current_step = 5
     
     # Ask about resources after providing information
-    time.sleep(1)
-    print("\nChatbot: If you have any other questions about mental health resources or would like to discuss something specific, feel free to ask. Would you like information about professional help resources in your region? [Please respond with: yes or no]")
-    
-    current_step = 5
+    return [response, RESOURCES_PROMPT]
 
-def handle_resources_input(input_text):
+@metrics.timed
+def handle_resources_input(session, input_text):
     """Handle user input for resources"""
-    global current_step
-    
     affirmative = "yes" in input_text.lower()
     
     if not affirmative:
-        print("Chatbot: I understand. Feel free to ask any other questions about mental health, or type 'exit' to end our conversation.")
-        current_step = 6
-        return
+        session.current_step = 6
+        return ["I understand. Feel free to ask any other questions about mental health, or type 'exit' to end our conversation."]
     
-    # Get resources for the country
-    resources = get_mental_health_resources(user_data["country"])
+    # Pre-rendered section for the country
+    with metrics.timer("render.resources"):
+        response = renderer.resources(session.country)
     
-    response = f"""Mental Health Resources:
+    session.current_step = 6
+    return [response]
 
-Resources in {user_data["country"]}:
-- {"\n- ".join(resources["local"])}
+STEP_HANDLERS = (
+    handle_rating_input,
+    handle_duration_input,
+    handle_symptoms_input,
+    handle_country_input,
+    handle_learn_more_input,
+    handle_resources_input
+)
 
-Global Resources:
-- {"\n- ".join(resources["global"])}
+GREETING = "Hi! I'm your Mental Health Assistant, trained on global mental health data. I'd like to understand how you're feeling. On a scale of 1-10, how would you rate your mental wellbeing today? (1 being very poor, 10 being excellent) [Please enter a number between 1-10]"
 
-Remember that in a serious emergency, you should call your local emergency services."""
-    
-    print(f"Chatbot: {response}")
-    current_step = 6
+FAREWELL = "Thank you for using the Mental Health Assistant. Remember that this tool provides information based on global mental health data, but is not a substitute for professional care. If you're experiencing mental health difficulties, please consider speaking with a healthcare professional."
 
-def process_user_input(input_text):
-    """Process user input based on current conversation step"""
+@metrics.timed(name="turn")
+def respond(input_text, session):
+    """Run one turn and return (replies, continue_chat) without printing"""
     if input_text.lower() == "exit":
-        print("\nChatbot: Thank you for using the Mental Health Assistant. Remember that this tool provides information based on global mental health data, but is not a substitute for professional care. If you're experiencing mental health difficulties, please consider speaking with a healthcare professional.")
-        return False
+        return [FAREWELL], False
     
     # Process input based on current step
-    if current_step == 0:
-        handle_rating_input(input_text)
-    elif current_step == 1:
-        handle_duration_input(input_text)
-    elif current_step == 2:
-        handle_symptoms_input(input_text)
-    elif current_step == 3:
-        handle_country_input(input_text)
-    elif current_step == 4:
-        handle_learn_more_input(input_text)
-    elif current_step == 5:
-        handle_resources_input(input_text)
-    else:
-        print("Chatbot: If you have any other questions about mental health, feel free to ask. You can type 'exit' to end our conversation.")
+    if session.current_step < len(STEP_HANDLERS):
+        return STEP_HANDLERS[session.current_step](session, input_text), True
+    return ["If you have any other questions about mental health, feel free to ask. You can type 'exit' to end our conversation."], True
+
+def process_user_input(input_text, session=None):
+    """Process user input based on the session's current conversation step"""
+    if session is None:
+        session = default_session
     
-    return True
+    replies, continue_chat = respond(input_text, session)
+    if not continue_chat:
+        print()
+    for reply in replies:
+        if reply == RESOURCES_PROMPT:
+            print()  # the CLI sets the follow-up question apart from the answer
+        print(f"Chatbot: {reply}")
+    
+    return continue_chat
 
 def main():
     """Main function to run the mental health assistant"""
@@ -422,7 +639,7 @@ def main():
         return
     
     # Start conversation with initial question
-    print("Chatbot: Hi! I'm your Mental Health Assistant, trained on global mental health data. I'd like to understand how you're feeling. On a scale of 1-10, how would you rate your mental wellbeing today? (1 being very poor, 10 being excellent) [Please enter a number between 1-10]")
+    print(f"Chatbot: {GREETING}")
     
     # Main conversation loop
     continue_chat = True
@@ -430,6 +647,9 @@ def main():
         user_input = input("\nYou: ").strip()
         print()  # Add a blank line after user input
         continue_chat = process_user_input(user_input)
+    
+    if metrics.enabled:
+        print(metrics.report())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
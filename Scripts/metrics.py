@@ -0,0 +1,196 @@
+import functools
+import os
+import time
+from collections import Counter
+
+# In-process latency histograms and counters for the assistant's hot paths.
+#
+# Step handlers and data accessors are wrapped with @timed, smaller sections
+# with `with timer(name):`, and cache lookups call count(). Everything is off
+# unless MHA_METRICS=1 is set or enable() is called: a disabled @timed wrapper
+# is one global check before the real call, timer() hands back a shared no-op
+# context and count() returns at once. When on, each timing lands in an
+# HDR-style histogram (log-linear buckets, SUB_BUCKETS per power of two, so
+# recorded values keep ~3% precision from nanoseconds to minutes in a few
+# hundred counters). report() formats everything as text and snapshot() as a
+# dict, which chat_server serves at GET /metrics.
+
+SUB_BUCKETS = 32  # per power of two; bucket width is at most 1/32 of its lower bound
+SUB_BITS = SUB_BUCKETS.bit_length() - 1
+
+enabled = os.environ.get("MHA_METRICS", "") not in ("", "0")
+histograms = {}
+counters = Counter()
+sources = {}
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+def reset():
+    histograms.clear()
+    counters.clear()
+
+def bucket_index(value):
+    """Bucket of a non-negative integer: exact below SUB_BUCKETS, then SUB_BUCKETS per octave"""
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+def bucket_bounds(index):
+    """[low, high) range of values counted in a bucket"""
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    low = (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+    return low, low + (1 << shift)
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in nanoseconds"""
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, value):
+        self.buckets[bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (capped at the true max)"""
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(bucket_bounds(index)[1] - 1, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1e3 if self.count else None,
+            "min_us": self.min / 1e3 if self.min is not None else None,
+            "p50_us": self._us(50),
+            "p90_us": self._us(90),
+            "p99_us": self._us(99),
+            "p999_us": self._us(99.9),
+            "max_us": self.max / 1e3
+        }
+
+    def _us(self, p):
+        value = self.percentile(p)
+        return value / 1e3 if value is not None else None
+
+def record(name, nanoseconds):
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = histograms[name] = LatencyHistogram()
+    histogram.record(nanoseconds)
+
+def count(name, n=1):
+    if enabled:
+        counters[name] += n
+
+def timed(fn=None, name=None):
+    """Decorator recording each call's duration under name (default: the function's name)"""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate(fn) if fn is not None else decorate
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter_ns() - self.start)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def timer(name):
+    """Context manager timing its block (a shared no-op while disabled)"""
+    return _Timer(name) if enabled else _NULL_TIMER
+
+def register_source(name, stats):
+    """Include a component's own stats() (cache hits, evictions, ...) in every report"""
+    sources[name] = stats
+
+def snapshot():
+    result = {
+        "enabled": enabled,
+        "latency": {name: h.summary() for name, h in sorted(histograms.items())},
+        "counters": dict(sorted(counters.items()))
+    }
+    for name, stats in sources.items():
+        try:
+            result.setdefault("sources", {})[name] = stats()
+        except Exception as e:
+            result.setdefault("sources", {})[name] = {"error": str(e)}
+    return result
+
+def report():
+    """Plain-text table of every histogram, counter and registered source"""
+    data = snapshot()
+    lines = [f"{'timer':<32} {'count':>8} {'mean':>10} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10}  (us)"]
+    for name, s in data["latency"].items():
+        lines.append(
+            f"{name:<32} {s['count']:>8} {s['mean_us']:>10.1f} {s['p50_us']:>10.1f} "
+            f"{s['p90_us']:>10.1f} {s['p99_us']:>10.1f} {s['max_us']:>10.1f}"
+        )
+    if data["counters"]:
+        lines.append("")
+        lines.extend(f"{name:<32} {value:>8}" for name, value in data["counters"].items())
+    for name, stats in data.get("sources", {}).items():
+        lines.append("")
+        lines.append(f"{name}: {stats}")
+    return "\n".join(lines)
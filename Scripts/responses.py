@@ -0,0 +1,133 @@
+from collections import OrderedDict
+
+# Pre-rendered text for the assistant's informational answers.
+#
+# The condition explanations are split once into static text around a short
+# slot line holding the only numbers (country rate, global rate), and every
+# country's resource section is rendered when the renderer is built. Finished
+# answers are memoized per (country, condition) in a bounded LRU cache, so a
+# repeated question is one dict hit; the cache is cleared whenever the data
+# behind the numbers is reloaded.
+
+CONDITION_TEMPLATES = {
+    "depression": (
+        """Information about Depression:
+
+Depression (major depressive disorder) causes persistent feelings of sadness and loss of interest. It affects how you feel, think, and behave and can lead to various emotional and physical problems.
+""",
+        "In {country}, approximately {rate:.1f}% of the population experiences depression.\n"
+        "This is {comparison} than the global average of {global_rate:.1f}%.",
+        """
+
+Evidence-based strategies for managing depression:
+
+1. Psychotherapy (especially CBT and Interpersonal Therapy)
+2. Medication (antidepressants) when prescribed by a healthcare provider
+3. Regular physical activity, which has been shown to reduce symptoms
+4. Maintaining social connections and talking about your feelings
+5. Establishing routines and setting achievable goals
+
+It's important to work with healthcare professionals for personalized treatment."""
+    ),
+    "anxiety": (
+        """Information about Anxiety:
+
+Anxiety disorders involve persistent, excessive worry or fear about everyday situations. Anxiety can manifest as physical symptoms and interfere with daily activities.
+""",
+        "In {country}, approximately {rate:.1f}% of the population experiences anxiety disorders.\n"
+        "This is {comparison} than the global average of {global_rate:.1f}%.",
+        """
+
+Evidence-based strategies for managing anxiety:
+
+1. Cognitive-behavioral therapy (CBT)
+2. Mindfulness and meditation practices
+3. Regular physical exercise
+4. Breathing techniques and progressive muscle relaxation
+5. Limiting caffeine and alcohol consumption
+6. Medication when prescribed by a healthcare provider
+
+It's important to work with healthcare professionals for personalized treatment."""
+    )
+}
+
+GENERAL_INFO = """Information about Mental Health:
+
+Mental health encompasses emotional, psychological, and social well-being, affecting how we think, feel, act, handle stress, relate to others, and make choices.
+
+Common evidence-based strategies for maintaining good mental health:
+
+1. Regular physical activity and a balanced diet
+2. Adequate sleep and consistent sleep schedule
+3. Social connection and supportive relationships
+4. Stress management techniques like mindfulness and relaxation
+5. Setting boundaries and practicing self-care
+6. Seeking professional help when needed
+
+Remember that everyone's mental health needs are different, and what works for one person may not work for another."""
+
+RESOURCES_PROMPT = "If you have any other questions about mental health resources or would like to discuss something specific, feel free to ask. Would you like information about professional help resources in your region? [Please respond with: yes or no]"
+
+RESOURCES_TEMPLATE = """Mental Health Resources:
+
+Resources in {country}:
+- {local}
+
+Global Resources:
+- {global_resources}
+
+Remember that in a serious emergency, you should call your local emergency services."""
+
+def render_condition_info(condition, country, rate, global_rate):
+    head, slots, tail = CONDITION_TEMPLATES[condition]
+    comparison = "lower" if rate < global_rate else "higher"
+    return head + slots.format(country=country, rate=rate, comparison=comparison, global_rate=global_rate) + tail
+
+def render_resources(country, resources):
+    return RESOURCES_TEMPLATE.format(
+        country=country,
+        local="\n- ".join(resources["local"]),
+        global_resources="\n- ".join(resources["global"])
+    )
+
+class ResponseRenderer:
+    """Answers for the learn-more and resources steps, rendered once and reused"""
+
+    def __init__(self, resources, default_resources, cache_size=1024):
+        self.resource_sections = {country: render_resources(country, r) for country, r in resources.items()}
+        self.default_resources = default_resources
+        self.cache_size = cache_size
+        self._answers = OrderedDict()  # (country, condition) -> text, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def condition_info(self, country, condition, rates):
+        """Explanation for a condition; rates() -> (country rate, global rate) runs only on a miss"""
+        if condition not in CONDITION_TEMPLATES:
+            return GENERAL_INFO
+        return self._memoized((country, condition), lambda: render_condition_info(condition, country, *rates()))
+
+    def resources(self, country):
+        section = self.resource_sections.get(country)
+        if section is not None:
+            return section
+        # Unlisted countries share the default lists but still name the country
+        return self._memoized((country, None), lambda: render_resources(country, self.default_resources))
+
+    def clear(self):
+        self._answers.clear()
+
+    def stats(self):
+        return {"cached": len(self._answers), "hits": self.hits, "misses": self.misses}
+
+    def _memoized(self, key, render):
+        text = self._answers.get(key)
+        if text is not None:
+            self.hits += 1
+            self._answers.move_to_end(key)
+            return text
+        self.misses += 1
+        text = self._answers[key] = render()
+        if len(self._answers) > self.cache_size:
+            self._answers.popitem(last=False)
+        return text
@@ -0,0 +1,163 @@
+import csv
+
+import numpy as np
+import pandas as pd
+
+# Load-time schemas for the tables the assistant answers from.
+#
+# A Schema declares the key column and the value fields a lookup needs, each
+# by header label or by column position, and whether a field is a float or a
+# yes/no flag. A positional field can also name the label expected at its
+# position, so a reordered header is caught too. compile_table() checks a
+# loaded frame against it (key present, every field resolvable, float fields
+# numeric) and raises SchemaError naming the file and the problem, so a
+# renamed, dropped, moved or retyped column fails when the table is loaded
+# rather than in the middle of a conversation. The fields
+# are copied into one C-contiguous float64 array (rows x fields, in declared
+# order) next to a key -> row dict, so a lookup is a dict probe plus an array
+# index; flags are stored as 1.0 / 0.0 (NaN when the cell is empty).
+
+FLOAT = "float"
+FLAG = "flag"
+
+class SchemaError(ValueError):
+    """A table does not match its declared schema"""
+
+class Field:
+    """One value column: a header label or an integer position, and its kind
+
+    label, for a positional field, is the header expected at that position.
+    """
+
+    def __init__(self, column, kind=FLOAT, label=None):
+        if kind not in (FLOAT, FLAG):
+            raise ValueError(f"unknown field kind {kind!r}")
+        self.column = column
+        self.kind = kind
+        self.label = label
+
+    def __repr__(self):
+        return f"Field({self.column!r}, {self.kind!r}, label={self.label!r})"
+
+class Schema:
+    """Declared layout of a table: key column, optional ordering column and named fields"""
+
+    def __init__(self, fields, key="Entity", latest_by=None):
+        self.fields = {name: f if isinstance(f, Field) else Field(f) for name, f in fields.items()}
+        self.key = key
+        self.latest_by = latest_by  # keep each key's last row by this column, else its first row
+        self.names = list(self.fields)
+        self.offsets = {name: i for i, name in enumerate(self.names)}
+
+    def resolve(self, columns, source="table"):
+        """Field -> column label for a header; SchemaError if the header does not fit"""
+        columns = list(columns)
+        problems = []
+        for required in (self.key, self.latest_by):
+            if required is not None and required not in columns:
+                problems.append(f"missing column {required!r}")
+        resolved = {}
+        for name, field in self.fields.items():
+            if isinstance(field.column, str):
+                if field.column in columns:
+                    resolved[name] = field.column
+                else:
+                    problems.append(f"{name}: missing column {field.column!r}")
+            elif not -len(columns) <= field.column < len(columns):
+                problems.append(f"{name}: no column at position {field.column} ({len(columns)} columns)")
+            elif columns[field.column] in (self.key, self.latest_by):
+                problems.append(f"{name}: position {field.column} is the {columns[field.column]!r} column")
+            elif field.label is not None and columns[field.column] != field.label:
+                problems.append(f"{name}: expected {field.label!r} at position {field.column}, found {columns[field.column]!r}")
+            else:
+                resolved[name] = columns[field.column]
+        if problems:
+            raise SchemaError(f"{source}: " + "; ".join(problems))
+        return resolved
+
+    def validate(self, df, source="table"):
+        """Resolved columns for a frame, also checking that float fields are numeric"""
+        resolved = self.resolve(df.columns, source)
+        problems = [
+            f"{name}: column {resolved[name]!r} is {df[resolved[name]].dtype}, expected numbers"
+            for name, field in self.fields.items()
+            if field.kind == FLOAT and not pd.api.types.is_numeric_dtype(df[resolved[name]].dtype)
+        ]
+        if problems:
+            raise SchemaError(f"{source}: " + "; ".join(problems))
+        return resolved
+
+class CompiledTable:
+    """Key -> row over a float64 array of a schema's fields"""
+
+    def __init__(self, schema, rows, values, columns, frame=None, source=None):
+        self.schema = schema
+        self.rows = rows
+        self.values = values
+        self.columns = columns  # field -> column label it was read from
+        self.frame = frame
+        self.source = source
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def keys(self):
+        return self.rows.keys()
+
+    def row(self, key):
+        return self.rows.get(key)
+
+    def value(self, key, field):
+        """One field for a key, None when the key is absent"""
+        row = self.rows.get(key)
+        return None if row is None else float(self.values[row, self.schema.offsets[field]])
+
+    def record(self, key):
+        """{field: float} for a key, None when the key is absent"""
+        row = self.rows.get(key)
+        return None if row is None else dict(zip(self.schema.names, self.values[row].tolist()))
+
+    def accessor(self, field):
+        """Function key -> float (None when absent) bound to one field's offset"""
+        rows, column = self.rows, self.values[:, self.schema.offsets[field]]
+
+        def get(key):
+            row = rows.get(key)
+            return None if row is None else float(column[row])
+        return get
+
+def read_header(path):
+    """Column labels on the first line of a CSV file"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+def _flag_values(series):
+    flags = series.astype(str).str.lower().str.contains("yes").astype(np.float64)
+    return flags.where(series.notna()).to_numpy()
+
+def compile_table(df, schema, source="table", keep_frame=True):
+    """Validate a frame against a schema and pack its fields; an empty table for None
+
+    keep_frame=False leaves the source frame out of the result, for tables
+    kept apart from the frame they were compiled from.
+    """
+    if df is None:
+        return CompiledTable(schema, {}, np.empty((0, len(schema.names))), {}, source=source)
+    columns = schema.validate(df, source)
+    ordered = df
+    if schema.latest_by is not None:
+        ordered = df.sort_values(by=schema.latest_by, kind="stable")
+        keep = ~ordered[schema.key].duplicated(keep="last").to_numpy()
+    else:
+        keep = ~ordered[schema.key].duplicated(keep="first").to_numpy()
+    selected = ordered[keep]
+
+    values = np.empty((len(selected), len(schema.names)), dtype=np.float64)
+    for i, (name, field) in enumerate(schema.fields.items()):
+        series = selected[columns[name]]
+        values[:, i] = _flag_values(series) if field.kind == FLAG else series.to_numpy(dtype=np.float64, na_value=np.nan)
+    rows = {key: i for i, key in enumerate(selected[schema.key].tolist())}
+    return CompiledTable(schema, rows, values, columns, frame=df if keep_frame else None, source=source)
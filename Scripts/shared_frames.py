@@ -0,0 +1,101 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import decode_column, encode_column
+
+# DataFrames published once into shared memory for worker processes.
+#
+# publish() encodes every column the way the columnar cache does (numbers as
+# they are, text as integer category codes) and copies each table into one
+# multiprocessing.shared_memory segment, columns laid end to end at 8-byte
+# aligned offsets. The returned layout (segment names, offsets, dtypes and
+# category lists) is small and picklable; attach() in another process maps the
+# same segments and rebuilds the DataFrames over them without copying, so N
+# workers hold one copy of the data between them. The publishing process owns
+# the segments and unlinks them in close().
+
+ALIGNMENT = 8
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def _frame(segment, table):
+    """DataFrame over the columns of one attached segment"""
+    data = {}
+    for entry in table["columns"]:
+        values = np.ndarray(entry["length"], dtype=np.dtype(entry["dtype"]), buffer=segment.buf, offset=entry["offset"])
+        values.flags.writeable = False
+        data[entry["name"]] = decode_column(entry, values)
+    return pd.DataFrame(data, copy=False)
+
+class SharedFrames:
+    """Read-only DataFrames backed by shared-memory segments"""
+
+    def __init__(self, layout, segments, owner=False):
+        self.layout = layout
+        self.segments = segments
+        self.owner = owner
+        self.frames = {name: _frame(segments[name], table) for name, table in layout.items()}
+
+    @classmethod
+    def publish(cls, frames):
+        """Copy {name: DataFrame} into new segments (None entries are skipped)"""
+        layout = {}
+        segments = {}
+        try:
+            for name, df in frames.items():
+                if df is None:
+                    continue
+                columns = []
+                offset = 0
+                for column in df.columns:
+                    entry, values = encode_column(df[column])
+                    if entry["kind"] == "categorical":
+                        # pandas' own code width, so from_codes() wraps the array instead of converting it
+                        values = decode_column(entry, values).codes
+                    values = np.ascontiguousarray(values)
+                    offset = _aligned(offset)
+                    entry.update(dtype=values.dtype.str, offset=offset, length=len(values))
+                    columns.append((entry, values))
+                    offset += values.nbytes
+                segment = segments[name] = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+                for entry, values in columns:
+                    target = np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf, offset=entry["offset"])
+                    target[:] = values
+                layout[name] = {"segment": segment.name, "size": offset, "columns": [entry for entry, _ in columns]}
+        except BaseException:
+            for segment in segments.values():
+                segment.close()
+                segment.unlink()
+            raise
+        return cls(layout, segments, owner=True)
+
+    @classmethod
+    def attach(cls, layout):
+        """Map segments published by another process"""
+        segments = {name: shared_memory.SharedMemory(name=table["segment"]) for name, table in layout.items()}
+        return cls(layout, segments)
+
+    @property
+    def nbytes(self):
+        return sum(table["size"] for table in self.layout.values())
+
+    def __getitem__(self, name):
+        return self.frames[name]
+
+    def __contains__(self, name):
+        return name in self.frames
+
+    def close(self):
+        """Drop the frames and unmap; the owner also removes the segments"""
+        self.frames.clear()
+        for segment in self.segments.values():
+            try:
+                segment.close()
+            except BufferError:
+                pass  # a caller still holds a view; the mapping goes away with the process
+            if self.owner:
+                segment.unlink()
+        self.segments.clear()
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from schema import read_header
+
+# Chunked, narrow-typed ingest for the large prevalence panels.
+#
+# Files like Data/all.csv and the per-disorder IHME extracts are read in chunks
+# of CHUNK_ROWS rows, keeping only the requested columns and parsing them
+# straight into narrow dtypes: Entity/Code as categoricals, Year as int16 and
+# every value column as float32. read_csv_narrow() stitches the chunks into one
+# frame (merging the per-chunk categories); stream_aggregates() never builds the
+# frame at all and folds each chunk into per-entity (or per-year) statistics, so
+# its memory is bounded by the chunk size and the number of groups.
+
+CHUNK_ROWS = 100_000
+
+CATEGORICAL_COLUMNS = ("Entity", "Code")
+INTEGER_COLUMNS = {"Year": "int16"}
+VALUE_DTYPE = "float32"
+
+def project_columns(path, columns=None):
+    """Requested columns (default: all) plus the key columns, in file order"""
+    header = read_header(path)
+    if columns is None:
+        return header
+    missing = [c for c in columns if c not in header]
+    if missing:
+        raise ValueError(f"{path} has no column(s) {missing}")
+    keep = set(columns) | {c for c in header if c in CATEGORICAL_COLUMNS or c in INTEGER_COLUMNS}
+    return [c for c in header if c in keep]
+
+def narrow_dtypes(columns):
+    dtypes = {}
+    for column in columns:
+        if column in CATEGORICAL_COLUMNS:
+            dtypes[column] = "category"
+        elif column in INTEGER_COLUMNS:
+            dtypes[column] = INTEGER_COLUMNS[column]
+        else:
+            dtypes[column] = VALUE_DTYPE
+    return dtypes
+
+def iter_chunks(path, columns=None, chunksize=CHUNK_ROWS):
+    """Narrow-typed chunks of a CSV, restricted to the projected columns"""
+    usecols = project_columns(path, columns)
+    return pd.read_csv(path, usecols=usecols, dtype=narrow_dtypes(usecols), chunksize=chunksize)
+
+def read_csv_narrow(path, columns=None, chunksize=CHUNK_ROWS):
+    """Whole table in narrow dtypes, read chunk by chunk"""
+    chunks = list(iter_chunks(path, columns, chunksize))
+    if len(chunks) == 1:
+        return chunks[0]
+    # Chunks carry their own categories; merge them so the columns stay categorical
+    combined = {}
+    for column in chunks[0].columns:
+        parts = [chunk[column] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            combined[column] = pd.Series(union_categoricals(parts, ignore_order=True), name=column)
+        else:
+            combined[column] = pd.Series(np.concatenate([p.to_numpy() for p in parts]), name=column)
+    return pd.DataFrame(combined)
+
+def _chunk_stats(chunk, by, columns):
+    values = chunk[columns].astype(np.float64)  # accumulate in float64 to avoid float32 drift
+    groups = values.groupby(chunk[by].to_numpy(), sort=False)
+    count = groups.count()
+    return {
+        "count": count,
+        "mean": groups.mean(),
+        "m2": groups.var(ddof=0) * count,  # sum of squared deviations from the mean
+        "min": groups.min(),
+        "max": groups.max()
+    }
+
+def _merge_moments(a, b):
+    """Combine two chunks' count/mean/m2 (Chan et al.'s parallel variance update)"""
+    index = a["count"].index.union(b["count"].index)
+    na, nb = (s["count"].reindex(index, fill_value=0) for s in (a, b))
+    mean_a, mean_b = (s["mean"].reindex(index).fillna(0) for s in (a, b))
+    m2_a, m2_b = (s["m2"].reindex(index).fillna(0) for s in (a, b))
+    n = na + nb
+    delta = mean_b - mean_a
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = (nb / n).fillna(0)
+        mean = mean_a + delta * share
+        m2 = m2_a + m2_b + delta * delta * (na * share)
+    empty = n == 0
+    return n, mean.mask(empty), m2.mask(empty)
+
+def _latest_records(chunk, by, columns):
+    ordered = chunk.sort_values("Year", kind="stable")
+    latest = ordered.drop_duplicates(subset=by, keep="last")
+    return latest[[by, "Year", *columns]].astype({by: object})
+
+def stream_aggregates(path, columns=None, by="Entity", chunksize=CHUNK_ROWS):
+    """Per-group count, mean, std, min, max (and, by Entity, the latest record) of value columns
+
+    Returns {statistic: DataFrame (group x column)}; "latest" is indexed by
+    entity and holds the most recent year's row. Only one chunk and the running
+    per-group totals are held in memory.
+    """
+    if columns is None:
+        columns = [c for c in read_header(path) if c not in CATEGORICAL_COLUMNS and c not in INTEGER_COLUMNS]
+    columns = list(columns)
+    totals = None
+    latest = None
+    for chunk in iter_chunks(path, [by, *columns], chunksize):
+        stats = _chunk_stats(chunk, by, columns)
+        if totals is None:
+            totals = stats
+        else:
+            totals["count"], totals["mean"], totals["m2"] = _merge_moments(totals, stats)
+            totals["min"] = totals["min"].combine(stats["min"], np.fmin)
+            totals["max"] = totals["max"].combine(stats["max"], np.fmax)
+        if by == "Entity" and "Year" in chunk.columns:
+            records = _latest_records(chunk, by, columns)
+            if latest is not None:
+                records = pd.concat([latest, records])
+                records = records.sort_values("Year", kind="stable").drop_duplicates(subset=by, keep="last")
+            latest = records
+
+    if totals is None:
+        return {}
+    count = totals["count"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = totals["m2"] / (count - 1)
+    result = {
+        "count": count.astype(np.int64),
+        "mean": totals["mean"],
+        "std": np.sqrt(variance.where(count > 1)),
+        "min": totals["min"],
+        "max": totals["max"]
+    }
+    if latest is not None:
+        result["latest"] = latest.set_index(by).sort_index()
+    return {name: frame.sort_index() for name, frame in result.items()}
+
+if __name__ == "__main__":
+    import sys
+    for path in sys.argv[1:]:
+        aggregates = stream_aggregates(path)
+        print(path)
+        print(aggregates["mean"].head())
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+
+import numpy as np
+from scipy import sparse
+
+from symptom_matcher import CONDITION_SYMPTOMS
+
+# Persisted TF-IDF index over the condition symptom phrases.
+#
+# build_index() fits a TfidfVectorizer on the symptom phrases once and keeps only
+# what scoring needs: the vocabulary, the idf weights and two L2-normalized
+# sparse matrices (phrase x term and condition x term, the latter being each
+# condition's phrases summed). The result is pickled under artifacts/ together
+# with a hash of the symptom table, and load_index() refits only when that hash
+# no longer matches. Queries are vectorized with the same analyzer in plain
+# Python (no sklearn at request time) and scored with one product against the
+# condition matrix; a batch of N messages is one sparse matmul.
+
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts")
+INDEX_PATH = os.path.join(ARTIFACT_DIR, "symptom_index.pkl")
+INDEX_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"(?u)\b\w+\b")
+NGRAM_RANGE = (1, 2)
+
+def table_hash(conditions):
+    return hashlib.sha1(json.dumps(conditions, sort_keys=True).encode()).hexdigest()
+
+def analyze(text):
+    """Same tokens as TfidfVectorizer(token_pattern=TOKEN_PATTERN, ngram_range=NGRAM_RANGE)"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    terms = list(tokens)
+    for n in range(max(2, NGRAM_RANGE[0]), NGRAM_RANGE[1] + 1):
+        terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return terms
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+class SymptomIndex:
+    def __init__(self, state):
+        self.conditions = state["conditions"]
+        self.phrases = state["phrases"]
+        self.phrase_conditions = state["phrase_conditions"]
+        self.vocabulary = state["vocabulary"]
+        self.idf = state["idf"]
+        self.phrase_matrix = state["phrase_matrix"]
+        self.condition_matrix = state["condition_matrix"]
+        self.table_hash = state["table_hash"]
+        # Transposed (term-major) copies so a product reads contiguous rows;
+        # single messages use a dense copy since it is only terms x conditions
+        self._condition_terms = self.condition_matrix.T.tocsr()
+        self._condition_terms_dense = self._condition_terms.toarray()
+        self._phrase_terms = self.phrase_matrix.T.tocsr()
+
+    def query_vector(self, text):
+        """Nonzero (columns, weights) of one message's L2-normalized TF-IDF vector"""
+        counts = {}
+        for term in analyze(text):
+            column = self.vocabulary.get(term)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        columns = np.fromiter(counts, dtype=np.int32, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts)) * self.idf[columns]
+        if len(weights):
+            weights /= np.sqrt(weights @ weights)
+        return columns, weights
+
+    def transform(self, texts):
+        """Messages -> L2-normalized TF-IDF rows (CSR, messages x terms)"""
+        indptr = [0]
+        indices = []
+        values = []
+        for text in texts:
+            columns, weights = self.query_vector(text)
+            indices.append(columns)
+            values.append(weights)
+            indptr.append(indptr[-1] + len(columns))
+        indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32)
+        values = np.concatenate(values) if values else np.zeros(0)
+        return sparse.csr_matrix((values, indices, indptr), shape=(len(texts), len(self.vocabulary)))
+
+    def score(self, text):
+        """Cosine similarity of one message to every condition, in table order"""
+        columns, weights = self.query_vector(text)
+        return weights @ self._condition_terms_dense[columns]
+
+    def score_batch(self, texts):
+        """Messages x conditions similarity matrix from one sparse product"""
+        return (self.transform(texts) @ self._condition_terms).toarray()
+
+    def phrase_scores_batch(self, texts):
+        """Messages x phrases similarity matrix"""
+        return (self.transform(texts) @ self._phrase_terms).toarray()
+
+    def rank(self, text, top=3, min_score=0.0):
+        """Best matching conditions as [(condition, score)]"""
+        scores = self.score(text)
+        order = np.argsort(-scores, kind="stable")[:top]
+        return [(self.conditions[i], float(scores[i])) for i in order if scores[i] > min_score]
+
+    def closest_phrases(self, text, top=5):
+        scores = self.phrase_scores_batch([text])[0]
+        order = np.argsort(-scores, kind="stable")[:top]
+        return [(self.phrases[i], float(scores[i])) for i in order if scores[i] > 0]
+
+def build_index(conditions=CONDITION_SYMPTOMS):
+    """Fit the vectorizer on the symptom phrases and return the index state"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    phrases = sorted({p.lower() for symptoms in conditions.values() for p in symptoms})
+    vectorizer = TfidfVectorizer(lowercase=True, token_pattern=TOKEN_PATTERN.pattern, ngram_range=NGRAM_RANGE)
+    phrase_matrix = vectorizer.fit_transform(phrases).tocsr()
+
+    condition_names = list(conditions)
+    phrase_ids = {p: i for i, p in enumerate(phrases)}
+    rows, cols = [], []
+    phrase_conditions = [[] for _ in phrases]
+    for j, condition in enumerate(condition_names):
+        for p in conditions[condition]:
+            rows.append(j)
+            cols.append(phrase_ids[p.lower()])
+            phrase_conditions[phrase_ids[p.lower()]].append(condition)
+    incidence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(condition_names), len(phrases)))
+
+    return {
+        "version": INDEX_VERSION,
+        "table_hash": table_hash(conditions),
+        "conditions": condition_names,
+        "phrases": phrases,
+        "phrase_conditions": phrase_conditions,
+        "vocabulary": {term: int(i) for term, i in vectorizer.vocabulary_.items()},
+        "idf": vectorizer.idf_.astype(np.float64),
+        "phrase_matrix": phrase_matrix,
+        "condition_matrix": _normalize_rows(incidence @ phrase_matrix).tocsr()
+    }
+
+def save_index(state, path=INDEX_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def load_index(conditions=CONDITION_SYMPTOMS, path=INDEX_PATH, rebuild=True):
+    """Load the persisted index, refitting (and re-saving) it if the symptom table changed"""
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") == INDEX_VERSION and state.get("table_hash") == table_hash(conditions):
+            return SymptomIndex(state)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    state = build_index(conditions)
+    if rebuild:
+        try:
+            save_index(state, path)
+        except OSError:
+            pass
+    return SymptomIndex(state)
+
+if __name__ == "__main__":
+    save_index(build_index())
+    print(f"Symptom index written to {INDEX_PATH}")
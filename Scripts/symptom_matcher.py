@@ -0,0 +1,166 @@
+import re
+
+import numpy as np
+
+# Single-pass symptom matcher.
+#
+# All symptom phrases of a condition table are compiled into one regex shaped
+# like a prefix trie, applied as a lookahead so it reports the longest phrase
+# starting at every position of the lowercased message in one scan. A phrase
+# occurs in the text exactly when it is a substring of one of those reported
+# phrases, so expanding each hit through a precomputed "contained phrases" table
+# gives the same answer as testing every phrase with `in`, including overlapping
+# phrases like "worry" / "excessive worry". Per-condition scores are then one
+# product of the phrase hit matrix with a phrase x condition incidence matrix.
+
+# Phrases the chat flow uses to pick a condition, in priority order
+ASSISTANT_SYMPTOMS = {
+    "depression": ["low mood", "sadness", "hopeless"],
+    "anxiety": ["worry", "anxious", "panic"],
+    "sleep issues": ["sleep", "insomnia"]
+}
+
+# Symptom table from the notebook's run_mental_health_assistant
+CONDITION_SYMPTOMS = {
+    "anxiety": [
+        "excessive worry", "restlessness", "fatigue", "difficulty concentrating",
+        "irritability", "muscle tension", "sleep problems", "panic attacks",
+        "feeling on edge", "sense of impending danger", "increased heart rate",
+        "nervousness", "feeling nervous", "anxiety", "anxious", "worry", "worried"
+    ],
+    "depression": [
+        "persistent sadness", "loss of interest", "appetite changes", "sleep changes",
+        "fatigue", "worthlessness", "difficulty concentrating", "suicidal thoughts",
+        "feeling empty", "hopelessness", "loss of energy", "moving slowly",
+        "depression", "depressed", "sad", "sadness", "low mood", "lack of motivation"
+    ],
+    "bipolar": [
+        "mood swings", "elevated mood", "decreased need for sleep", "racing thoughts",
+        "poor decision making", "irritability", "inflated self-esteem", "depressive episodes",
+        "excessive talking", "increased energy", "risky behavior", "high and low moods",
+        "bipolar", "mania", "manic", "hypomania"
+    ],
+    "ptsd": [
+        "flashbacks", "nightmares", "severe anxiety", "uncontrollable thoughts",
+        "avoidance", "negative thoughts", "emotional numbness", "easily startled",
+        "always on guard", "self-destructive behavior", "trouble concentrating",
+        "trouble sleeping", "trauma", "traumatic", "ptsd"
+    ],
+    "ocd": [
+        "intrusive thoughts", "repetitive behaviors", "excessive orderliness",
+        "fear of contamination", "unwanted thoughts", "mental rituals", "checking",
+        "counting", "arranging", "hoarding", "perfectionism", "need for symmetry",
+        "obsessions", "compulsions", "obsessive", "compulsive", "ocd"
+    ]
+}
+
+def build_trie(phrases):
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = phrase
+    return trie
+
+def trie_pattern(trie):
+    """Regex alternation of the trie's phrases with common prefixes factored out"""
+    branches = [re.escape(ch) + trie_pattern(child) for ch, child in sorted(trie.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # A phrase ends here: the longer continuations are optional (and greedy)
+    return f"(?:{body})?" if "" in trie else body
+
+def contained_phrases(phrase, trie):
+    """Every trie phrase that is a substring of phrase"""
+    found = set()
+    for start in range(len(phrase)):
+        node = trie
+        for ch in phrase[start:]:
+            node = node.get(ch)
+            if node is None:
+                break
+            if "" in node:
+                found.add(node[""])
+    return found
+
+class SymptomMatcher:
+    """Scores every condition of a {condition: [phrases]} table in one pass over a message"""
+
+    def __init__(self, conditions):
+        self.conditions = list(conditions)
+        self.phrases = sorted({p.lower() for phrases in conditions.values() for p in phrases})
+        self.phrase_ids = {p: i for i, p in enumerate(self.phrases)}
+
+        trie = build_trie(self.phrases)
+        self.pattern = re.compile(f"(?=({trie_pattern(trie)}))")
+
+        # Phrase -> ids of every phrase it contains (itself included)
+        self.contained = {
+            p: [self.phrase_ids[q] for q in contained_phrases(p, trie)]
+            for p in self.phrases
+        }
+
+        self.incidence = np.zeros((len(self.phrases), len(self.conditions)), dtype=np.int32)
+        self.condition_phrases = []
+        self.memberships = [[] for _ in self.phrases]  # phrase id -> [(condition index, position)]
+        for j, condition in enumerate(self.conditions):
+            ids = [self.phrase_ids[p.lower()] for p in conditions[condition]]
+            self.incidence[ids, j] = 1
+            self.condition_phrases.append(ids)
+            for position, i in enumerate(ids):
+                self.memberships[i].append((j, position))
+
+    def matched_ids(self, text):
+        """Ids of every phrase occurring in text"""
+        found = set()
+        for longest in set(self.pattern.findall(text.lower())):
+            found.update(self.contained[longest])
+        return found
+
+    def hits(self, texts):
+        """Message x phrase 0/1 matrix"""
+        matrix = np.zeros((len(texts), len(self.phrases)), dtype=np.int32)
+        for row, text in enumerate(texts):
+            ids = self.matched_ids(text)
+            if ids:
+                matrix[row, list(ids)] = 1
+        return matrix
+
+    def scores(self, text):
+        """Number of matched phrases per condition, in table order"""
+        return self.scores_batch([text])[0]
+
+    def scores_batch(self, texts):
+        """Message x condition matrix of matched-phrase counts"""
+        return self.hits(texts) @ self.incidence
+
+    def first_match(self, text, default=None):
+        """First condition in table order with any matched phrase"""
+        ids = self.matched_ids(text)
+        if not ids:
+            return default
+        return self.conditions[min(j for i in ids for j, _ in self.memberships[i])]
+
+    def classify_batch(self, texts, default=None):
+        results = []
+        for row in self.scores_batch(texts):
+            nonzero = np.flatnonzero(row)
+            results.append(self.conditions[nonzero[0]] if len(nonzero) else default)
+        return results
+
+    def rank(self, text):
+        """Matched conditions sorted by match count, as [(condition, details)]"""
+        per_condition = {}
+        for i in self.matched_ids(text):
+            for j, position in self.memberships[i]:
+                per_condition.setdefault(j, []).append((position, self.phrases[i]))
+        matches = []
+        for j in sorted(per_condition):
+            matched = [phrase for _, phrase in sorted(per_condition[j])]
+            matches.append((self.conditions[j], {"matched_symptoms": matched, "matched_count": len(matched)}))
+        return sorted(matches, key=lambda x: x[1]["matched_count"], reverse=True)
+
+assistant_matcher = SymptomMatcher(ASSISTANT_SYMPTOMS)
+condition_matcher = SymptomMatcher(CONDITION_SYMPTOMS)
@@ -0,0 +1,69 @@
+import pytest
+
+from country_resolver import CountryResolver, normalize_name
+
+ENTITIES = ["United States", "United Kingdom", "India", "Iran", "Iraq", "Dominica", "Dominican Republic", "Germany", "Cote d'Ivoire"]
+CODES = ["USA", "GBR", "IND", "IRN", "IRQ", "DMA", "DOM", "DEU", "CIV"]
+
+
+@pytest.fixture
+def resolver():
+    return CountryResolver().add(ENTITIES, CODES)
+
+
+def test_normalize_name_folds_case_accents_and_punctuation():
+    assert normalize_name("  Côte d'Ivoire ") == "cote divoire"
+    assert normalize_name("The Gambia") == "gambia"
+
+
+@pytest.mark.parametrize("name, entity", [
+    ("India", "India"),
+    ("united kingdom", "United Kingdom"),
+    ("Cote d'Ivoire", "Cote d'Ivoire"),
+    ("USA", "United States"),
+    ("the uk", "United Kingdom"),
+    ("ivory coast", "Cote d'Ivoire"),
+    ("deu", "Germany"),
+])
+def test_exact_alias_and_code(resolver, name, entity):
+    assert resolver.resolve(name) == entity
+
+
+@pytest.mark.parametrize("name, entity", [("Inida", "India"), ("Germny", "Germany"), ("Dominca", "Dominica")])
+def test_single_close_typo_resolves(resolver, name, entity):
+    assert resolver.resolve(name) == entity
+
+
+@pytest.mark.parametrize("name, options", [
+    ("Irak", ["Iran", "Iraq"]),
+    ("Dominican", ["Dominica", "Dominican Republic"]),
+])
+def test_ambiguous_names_are_not_guessed(resolver, name, options):
+    assert resolver.resolve(name) is None
+    assert sorted(resolver.ambiguous(name)) == options
+
+
+def test_prefix_alone_does_not_resolve():
+    resolver = CountryResolver().add(["Dominican Republic"])
+    assert resolver.resolve("Dominican") is None
+
+
+@pytest.mark.parametrize("name", ["Narnia", "", "Ira"])
+def test_miss(resolver, name):
+    assert resolver.resolve(name) is None
+    assert resolver.ambiguous(name) == []
+
+
+def test_unhashable_name_is_a_miss(resolver):
+    assert resolver.resolve(["India"]) is None
+
+
+def test_alias_needs_its_entity_indexed():
+    assert CountryResolver().add(["India"]).resolve("usa") is None
+
+
+def test_results_are_cached(resolver):
+    resolver.resolve("Inida")
+    resolver.resolve("Inida")
+    assert resolver.stats()["hits"] == 1
+    assert resolver.stats()["misses"] == 1
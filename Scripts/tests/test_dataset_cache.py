@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset_cache
+from dataset_cache import build_cache, is_fresh, read_csv_cached, read_manifest
+
+
+@pytest.fixture
+def csv_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_cache, "MIN_CACHE_BYTES", 0)
+    path = str(tmp_path / "table.csv")
+    pd.DataFrame({"Entity": ["India", "Iran"], "Year": [2019, 2019], "Rate": [3.5, 4.25]}).to_csv(path, index=False)
+    return path
+
+
+def touch(path, seconds=10):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+def test_round_trip(csv_path):
+    build_cache(csv_path)
+    df = read_csv_cached(csv_path)
+    assert df["Entity"].tolist() == ["India", "Iran"]
+    assert np.array_equal(df["Rate"].to_numpy(), [3.5, 4.25])
+
+
+def test_unchanged_file_is_fresh(csv_path):
+    build_cache(csv_path)
+    assert is_fresh(csv_path, read_manifest(csv_path))
+
+
+def test_touched_but_identical_file_stays_fresh_and_records_new_signature(csv_path):
+    build_cache(csv_path)
+    touch(csv_path)
+    assert is_fresh(csv_path, read_manifest(csv_path))
+    assert read_manifest(csv_path)["signature"] == dataset_cache.file_signature(csv_path)
+
+
+def test_changed_file_is_stale_and_reparsed(csv_path):
+    build_cache(csv_path)
+    with open(csv_path, "a") as f:
+        f.write("Iraq,2019,5.0\n")
+    touch(csv_path)
+    assert not is_fresh(csv_path, read_manifest(csv_path))
+    assert read_csv_cached(csv_path)["Entity"].tolist() == ["India", "Iran", "Iraq"]
+    assert read_manifest(csv_path)["rows"] == 3
+
+
+def test_same_size_edit_with_new_mtime_is_stale(csv_path):
+    build_cache(csv_path)
+    with open(csv_path) as f:
+        text = f.read()
+    with open(csv_path, "w") as f:
+        f.write(text.replace("4.25", "9.25"))
+    touch(csv_path)
+    assert read_csv_cached(csv_path)["Rate"].tolist() == [3.5, 9.25]
+
+
+def test_other_cache_version_is_ignored(csv_path):
+    build_cache(csv_path)
+    manifest_path = os.path.join(dataset_cache.cache_dir_for(csv_path), dataset_cache.MANIFEST)
+    with open(manifest_path) as f:
+        text = f.read()
+    with open(manifest_path, "w") as f:
+        f.write(text.replace(f'"version": {dataset_cache.CACHE_VERSION}', '"version": 0'))
+    assert read_manifest(csv_path) is None
@@ -0,0 +1,80 @@
+import math
+import re
+
+import pandas as pd
+import pytest
+
+from schema import FLAG, Field, Schema, SchemaError, compile_table
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "Entity": ["india", "iran", "india"],
+        "Year": [2019, 2019, 2020],
+        "Rate": [3.5, 4.25, 3.75],
+        "Policy": ["Yes", "No", None]
+    })
+
+
+def test_fields_by_label_and_position(frame):
+    schema = Schema({"rate": "Rate", "policy": Field(-1, FLAG)})
+    table = compile_table(frame, schema)
+    assert table.columns == {"rate": "Rate", "policy": "Policy"}
+    assert table.values.flags["C_CONTIGUOUS"]
+    assert table.record("iran") == {"rate": 4.25, "policy": 0.0}
+
+
+def test_first_row_per_key_by_default(frame):
+    table = compile_table(frame, Schema({"rate": "Rate"}))
+    assert table.value("india", "rate") == 3.5
+    assert len(table) == 2
+
+
+def test_latest_row_per_key(frame):
+    table = compile_table(frame, Schema({"rate": "Rate", "policy": Field(-1, FLAG)}, latest_by="Year"))
+    assert table.value("india", "rate") == 3.75
+    assert math.isnan(table.value("india", "policy"))
+
+
+def test_missing_key_and_absent_values(frame):
+    table = compile_table(frame, Schema({"rate": "Rate"}))
+    assert table.row("narnia") is None
+    assert table.record("narnia") is None
+    assert table.accessor("rate")("narnia") is None
+    assert table.accessor("rate")("iran") == 4.25
+
+
+def test_missing_file_compiles_empty():
+    table = compile_table(None, Schema({"rate": "Rate"}))
+    assert len(table) == 0
+    assert table.record("india") is None
+
+
+@pytest.mark.parametrize("fields, message", [
+    ({"rate": "Rate (%)"}, "missing column 'Rate (%)'"),
+    ({"rate": 7}, "no column at position 7"),
+    ({"rate": "Policy"}, "expected numbers"),
+    ({"rate": 0}, "is the 'Entity' column"),
+    ({"rate": Field(2, label="Prevalence")}, "expected 'Prevalence' at position 2, found 'Rate'"),
+])
+def test_drift_is_reported(frame, fields, message):
+    with pytest.raises(SchemaError, match=re.escape(message)):
+        compile_table(frame, Schema(fields), source="table.csv")
+
+
+def test_missing_key_column(frame):
+    with pytest.raises(SchemaError, match="missing column 'Entity'"):
+        compile_table(frame.drop(columns="Entity"), Schema({"rate": "Rate"}))
+
+
+def test_reordered_columns_fail_a_labelled_position(frame):
+    schema = Schema({"rate": Field(2, label="Rate")})
+    assert compile_table(frame, schema).value("iran", "rate") == 4.25
+    with pytest.raises(SchemaError):
+        compile_table(frame[["Entity", "Year", "Policy", "Rate"]], schema)
+
+
+def test_frame_is_optional(frame):
+    assert compile_table(frame, Schema({"rate": "Rate"})).frame is frame
+    assert compile_table(frame, Schema({"rate": "Rate"}), keep_frame=False).frame is None
@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+
+# Trend and comparison queries over the disorder prevalence panels.
+#
+# A panel (Data/all.csv or processed_data/disorders.csv) is stored as a dense
+# entity x year x condition float cube, NaN where a value is missing. Every
+# query is an index or a slice of that cube, and the cross-country ones
+# (deltas, CAGR, rankings, percentiles) are vectorized over the entity axis, so
+# nothing is filtered or grouped per query.
+
+# all.csv column -> short condition name
+ALL_CSV_CONDITIONS = {
+    "Schizophrenia disorders (share of population) - Sex: Both - Age: Age-standardized": "schizophrenia",
+    "Depressive disorders (share of population) - Sex: Both - Age: Age-standardized": "depression",
+    "Anxiety disorders (share of population) - Sex: Both - Age: Age-standardized": "anxiety",
+    "Bipolar disorders (share of population) - Sex: Both - Age: Age-standardized": "bipolar",
+    "Eating disorders (share of population) - Sex: Both - Age: Age-standardized": "eating"
+}
+
+# processed_data/disorders.csv column -> short condition name
+DISORDERS_CONDITIONS = {
+    "Schizophrenia": "schizophrenia",
+    "Eating Disorders": "eating",
+    "Bipolar": "bipolar",
+    "Anxiety": "anxiety"
+}
+
+class PanelCube:
+    """Dense entity x year x condition view of a prevalence panel"""
+
+    def __init__(self, df, columns, codes=None):
+        """columns maps panel column -> condition name; codes maps Entity -> ISO code"""
+        entity_codes, self.entities = pd.factorize(df["Entity"], sort=True)
+        self.entities = [str(e) for e in self.entities]
+        self.entity_ids = {e: i for i, e in enumerate(self.entities)}
+        years = df["Year"].to_numpy()
+        self.first_year = int(years.min())
+        self.years = np.arange(self.first_year, int(years.max()) + 1)
+        self.conditions = list(columns.values())
+        self.condition_ids = {c: i for i, c in enumerate(self.conditions)}
+
+        self.values = np.full((len(self.entities), len(self.years), len(self.conditions)), np.nan)
+        self.values[entity_codes, years - self.first_year, :] = df[list(columns)].to_numpy(dtype=np.float64)
+
+        # Countries are entities with an ISO code; regions and income groups have
+        # none and World uses an OWID_ code, so rankings leave them out
+        if codes is None and "Code" in df.columns:
+            codes = dict(zip(df["Entity"], df["Code"]))
+        if codes is None:
+            self.is_country = np.ones(len(self.entities), dtype=bool)
+        else:
+            self.is_country = np.array([
+                isinstance(codes.get(e), str) and not codes[e].startswith("OWID") for e in self.entities
+            ])
+
+        # Latest non-missing year per entity and condition
+        present = ~np.isnan(self.values)
+        last = len(self.years) - 1 - np.argmax(present[:, ::-1, :], axis=1)
+        last[~present.any(axis=1)] = -1
+        self.latest_index = last
+        self.latest = np.where(
+            last >= 0,
+            np.take_along_axis(self.values, np.maximum(last, 0)[:, None, :], axis=1)[:, 0, :],
+            np.nan
+        )
+
+        # Cross-country rank (1 = highest) and percentile of each entity's latest value
+        self.latest_rank, self.latest_percentile = self._rank_matrix(self.latest)
+
+    # Lookups
+
+    def entity_index(self, entity):
+        return self.entity_ids.get(entity)
+
+    def year_index(self, year):
+        index = int(year) - self.first_year
+        if not 0 <= index < len(self.years):
+            raise KeyError(f"year {year} outside {self.years[0]}-{self.years[-1]}")
+        return index
+
+    def series(self, entity, condition):
+        """(years, values) for one entity and condition"""
+        return self.years, self.values[self.entity_ids[entity], :, self.condition_ids[condition]]
+
+    def value(self, entity, condition, year=None):
+        e, c = self.entity_ids[entity], self.condition_ids[condition]
+        if year is None:
+            return self.latest[e, c]
+        return self.values[e, self.year_index(year), c]
+
+    def slice_year(self, year):
+        """entity x condition matrix for one year"""
+        return self.values[:, self.year_index(year), :]
+
+    # Changes over time
+
+    def deltas(self, start_year, end_year=None):
+        """entity x condition absolute change between two years (end defaults to last year)"""
+        end = self._end_values(end_year)
+        return end - self.slice_year(start_year)
+
+    def percent_changes(self, start_year, end_year=None):
+        start = self.slice_year(start_year)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (self._end_values(end_year) - start) / start * 100
+
+    def cagr(self, start_year, end_year=None):
+        """entity x condition compound annual growth rate, in percent"""
+        end_year = self.years[-1] if end_year is None else end_year
+        periods = int(end_year) - int(start_year)
+        if periods <= 0:
+            raise ValueError("end_year must be after start_year")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (np.power(self._end_values(end_year) / self.slice_year(start_year), 1.0 / periods) - 1) * 100
+
+    def change(self, entity, condition, start_year, end_year=None):
+        """Start/end values, absolute and percent change and CAGR for one entity"""
+        e, c = self.entity_ids[entity], self.condition_ids[condition]
+        end_year = int(self.years[-1] if end_year is None else end_year)
+        start = self.values[e, self.year_index(start_year), c]
+        end = self.values[e, self.year_index(end_year), c]
+        periods = end_year - int(start_year)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "start_year": int(start_year),
+                "end_year": end_year,
+                "start": float(start),
+                "end": float(end),
+                "change": float(end - start),
+                "percent_change": float((end - start) / start * 100),
+                "cagr": float((np.power(end / start, 1.0 / periods) - 1) * 100) if periods > 0 else float("nan")
+            }
+
+    # Cross-country comparisons
+
+    def rank(self, condition, year=None, top=10, ascending=False, countries_only=True):
+        """[(entity, value)] ordered by prevalence for one condition"""
+        c = self.condition_ids[condition]
+        column = self.latest[:, c] if year is None else self.values[:, self.year_index(year), c]
+        mask = ~np.isnan(column)
+        if countries_only:
+            mask &= self.is_country
+        candidates = np.flatnonzero(mask)
+        order = candidates[np.argsort(column[candidates] if ascending else -column[candidates], kind="stable")]
+        if top is not None:
+            order = order[:top]
+        return [(self.entities[i], float(column[i])) for i in order]
+
+    def percentile(self, entity, condition, year=None):
+        """Share of countries (in percent) with a lower value"""
+        e, c = self.entity_ids[entity], self.condition_ids[condition]
+        if year is None:
+            return float(self.latest_percentile[e, c])
+        _, percentiles = self._rank_matrix(self.slice_year(year))
+        return float(percentiles[e, c])
+
+    def percentiles(self, values, q):
+        """Per-condition percentiles (q may be a list) of an entity x condition matrix over countries"""
+        return np.nanpercentile(values[self.is_country], q, axis=0)
+
+    def summary(self, entity, start_year=None):
+        """Latest value, change since start_year, CAGR, rank and percentile per condition"""
+        e = self.entity_ids.get(entity)
+        if e is None:
+            return None
+        start_year = self.first_year if start_year is None else start_year
+        start = self.values[e, self.year_index(start_year), :]
+        latest = self.latest[e]
+        periods = self.years[self.latest_index[e]] - start_year
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cagr = (np.power(latest / start, 1.0 / np.where(periods > 0, periods, np.nan)) - 1) * 100
+        result = {}
+        for c, condition in enumerate(self.conditions):
+            if np.isnan(latest[c]):
+                continue
+            result[condition] = {
+                "latest_year": int(self.years[self.latest_index[e, c]]),
+                "latest": float(latest[c]),
+                "start_year": int(start_year),
+                "start": float(start[c]),
+                "change": float(latest[c] - start[c]),
+                "cagr": float(cagr[c]),
+                "rank": int(self.latest_rank[e, c]) if self.is_country[e] else None,
+                "percentile": float(self.latest_percentile[e, c]) if self.is_country[e] else None
+            }
+        return result
+
+    def _end_values(self, end_year):
+        if end_year is None:
+            return self.values[:, -1, :]
+        return self.slice_year(end_year)
+
+    def _rank_matrix(self, matrix):
+        """Rank (1 = highest) and percentile of every entity per condition, over countries"""
+        ranks = np.zeros(matrix.shape, dtype=np.int32)
+        percentiles = np.full(matrix.shape, np.nan)
+        countries = np.flatnonzero(self.is_country)
+        for c in range(matrix.shape[1]):
+            column = matrix[countries, c]
+            valid = countries[~np.isnan(column)]
+            values = matrix[valid, c]
+            order = np.argsort(-values, kind="stable")
+            ranks[valid[order], c] = np.arange(1, len(valid) + 1)
+            # Percentile: share of countries strictly below
+            below = np.searchsorted(np.sort(values), values, side="left")
+            percentiles[valid, c] = below / max(len(valid), 1) * 100
+        return ranks, percentiles
+
+def build_cubes(all_df=None, disorders_df=None):
+    """PanelCubes for the loaded panels, keyed "all" and "disorders" """
+    cubes = {}
+    codes = None
+    if all_df is not None:
+        cubes["all"] = PanelCube(all_df, ALL_CSV_CONDITIONS)
+        codes = dict(zip(all_df["Entity"], all_df["Code"]))
+    if disorders_df is not None:
+        # disorders.csv has no Code column; borrow all.csv's where available
+        cubes["disorders"] = PanelCube(disorders_df, DISORDERS_CONDITIONS, codes=codes)
+    return cubes
@@ -0,0 +1,374 @@
+import contextlib
+import gc
+import io
+import multiprocessing
+import os
+import pickle
+import stat
+import zlib
+from collections import deque
+from functools import partial
+
+import mental_health_assistant as assistant
+from shared_frames import SharedFrames
+
+# Multi-process serving for the mental health assistant.
+#
+# The parent loads every dataset once, publishes them with SharedFrames and
+# switches its own registry over to the shared copies. It then runs the
+# initializer (chat_server's warm_up: snapshots, trend cubes, aggregates,
+# resolver, condition model) before forking, so what is shared is:
+#
+#   - the raw tables: shared_memory segments, mapped once for every process;
+#   - everything derived from them: built once in the parent and inherited by
+#     the forked workers copy-on-write. Their numpy arrays are never written,
+#     so those pages stay shared; only the Python objects around them become
+#     private as reference counts change.
+#
+# Private to each worker: its SessionManager (conversation state) and caches
+# filled while serving (rendered answers, resolver results). A session always
+# goes to the same worker (CRC-32 of its id), so its state never moves between
+# processes. Turns are sent in per-worker batches: process_batch() from
+# blocking code, or process_async() from an asyncio loop (chat_server
+# --workers). A turn that raises comes back as that exception; a worker that
+# exits fails whatever was waiting on it with WorkerCrashed and is replaced
+# (its sessions start over). The parent also keeps a SessionManager as a
+# directory of open sessions for /health.
+
+def worker_for(session_id, workers):
+    return zlib.crc32(str(session_id).encode()) % workers
+
+def private_bytes(pid="self"):
+    """Resident memory only this process maps (Linux; None elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+    return sum(int(fields[key].split()[0]) * 1024 for key in ("Private_Clean", "Private_Dirty") if key in fields)
+
+class WorkerCrashed(RuntimeError):
+    """A worker process exited before answering"""
+
+def _close_inherited_sockets(keep):
+    """Close sockets forked from the parent (a server's listener and client connections)
+
+    A worker replaced while chat_server is running would otherwise hold those
+    connections open after the parent has closed them.
+    """
+    try:
+        fds = [int(fd) for fd in os.listdir("/proc/self/fd")]
+    except OSError:
+        fds = range(3, 1024)
+    for fd in fds:
+        if fd <= 2 or fd == keep:
+            continue
+        try:
+            if stat.S_ISSOCK(os.fstat(fd).st_mode):
+                os.close(fd)
+        except OSError:
+            pass
+
+def _turn(manager, session_id, text):
+    """(replies, continue_chat), or the exception the turn raised"""
+    try:
+        return manager.process(session_id, text)
+    except Exception as e:
+        return e
+
+def _consume_outcome(future):
+    if not future.cancelled():
+        future.exception()
+
+def _serve(conn, load, initializer):
+    """Worker loop: answer requests until told to stop
+
+    A forked worker starts with the parent's registry over the shared segments
+    and everything already built from it; with load set (private copies) it
+    loads and warms up its own.
+    """
+    _close_inherited_sockets(conn.fileno())
+    if load:
+        with contextlib.redirect_stdout(io.StringIO()):
+            assistant.load_all_datasets()
+        if initializer is not None:
+            initializer()
+    manager = assistant.SessionManager()
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        kind, payload = message
+        if kind == "turns":
+            result = [_turn(manager, session_id, text) for session_id, text in payload]
+        elif kind == "end":
+            manager.end(payload)
+            result = None
+        elif kind == "stats":
+            result = {
+                "pid": os.getpid(),
+                "sessions": len(manager),
+                "expired_sessions": manager.expired,
+                "private_bytes": private_bytes()
+            }
+        else:
+            result = ValueError(f"unknown request {kind!r}")
+        try:
+            conn.send(result)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # An exception that can't be pickled: send its text instead
+            conn.send([RuntimeError(repr(r)) if isinstance(r, Exception) else r for r in result]
+                      if isinstance(result, list) else RuntimeError(repr(result)))
+    conn.close()
+
+class WorkerPool:
+    """Sessions spread over forked worker processes sharing one copy of the datasets"""
+
+    def __init__(self, workers=None, shared=True, initializer=None, idle_timeout=30 * 60):
+        self.workers = workers or os.cpu_count() or 1
+        self.shared_datasets = shared
+        self.initializer = initializer
+        self.directory = assistant.SessionManager(idle_timeout)
+        self.shared = None
+        self.processes = []
+        self.connections = []
+        self.pending = []  # per worker: futures awaiting replies, in send order
+        self.loop = None
+        self.context = multiprocessing.get_context("fork")
+        self.restarts = 0
+
+    def start(self):
+        if self.shared_datasets:
+            if not assistant.datasets and not assistant.load_all_datasets():
+                raise RuntimeError("the datasets could not be loaded")
+            frames = {name: assistant.datasets.get(name) for name in assistant.DATASET_FILES}
+            self.shared = SharedFrames.publish(frames)
+            # The parent reads the shared copies too, so the private frames can go before forking
+            assistant.use_datasets({name: partial(self.shared.__getitem__, name) for name in self.shared.layout})
+            del frames
+            gc.collect()
+            # Derived tables are built once, here, and inherited by every worker
+            if self.initializer is not None:
+                self.initializer()
+        # Maps the condition model before forking, so the workers inherit it
+        assistant.get_condition_model()
+
+        for _ in range(self.workers):
+            process, conn = self._spawn()
+            self.processes.append(process)
+            self.connections.append(conn)
+            self.pending.append(deque())
+        return self
+
+    def _spawn(self):
+        parent_conn, child_conn = self.context.Pipe()
+        load = not self.shared_datasets
+        process = self.context.Process(target=_serve, args=(child_conn, load, self.initializer), daemon=True)
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _crashed(self, worker):
+        """Fail everything waiting on a worker that exited and start a replacement"""
+        error = WorkerCrashed(f"worker {worker} (pid {self.processes[worker].pid}) exited")
+        while self.pending[worker]:
+            future = self.pending[worker].popleft()
+            if not future.done():
+                future.set_exception(error)
+        conn = self.connections[worker]
+        if self.loop is not None:
+            self.loop.remove_reader(conn.fileno())
+        conn.close()
+        self.processes[worker].join(timeout=1)
+        if self.processes[worker].is_alive():
+            self.processes[worker].terminate()
+        self.processes[worker], self.connections[worker] = self._spawn()
+        self.restarts += 1
+        if self.loop is not None:
+            self.loop.add_reader(self.connections[worker].fileno(), self._on_readable, worker)
+        return error
+
+    def close(self):
+        if self.loop is not None:
+            for conn in self.connections:
+                self.loop.remove_reader(conn.fileno())
+            self.loop = None
+        for conn in self.connections:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self.connections:
+            conn.close()
+        self.processes.clear()
+        self.connections.clear()
+        self.pending.clear()
+        if self.shared is not None:
+            # Back to reading the CSVs in this process before the segments go away
+            assistant.use_datasets(assistant.file_loaders())
+            gc.collect()
+            self.shared.close()
+            self.shared = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # SessionManager interface (the parent-side directory of open sessions)
+
+    def __len__(self):
+        return len(self.directory)
+
+    def __contains__(self, session_id):
+        return session_id in self.directory
+
+    @property
+    def expired(self):
+        return self.directory.expired
+
+    def get(self, session_id):
+        return self.directory.get(session_id)
+
+    def end(self, session_id):
+        self.directory.end(session_id)
+        worker = worker_for(session_id, self.workers)
+        if self.loop is None:
+            self._request(worker, ("end", session_id))
+        else:
+            # Nobody awaits the acknowledgement; consume its outcome so a
+            # worker crash is not logged as "exception was never retrieved"
+            self._submit(worker, ("end", session_id)).add_done_callback(_consume_outcome)
+
+    # Blocking API
+
+    def _send(self, worker, message):
+        """Send to a worker, replacing it first if it has already exited"""
+        try:
+            self.connections[worker].send(message)
+        except OSError:
+            self._crashed(worker)
+            self.connections[worker].send(message)
+
+    def _receive(self, worker):
+        """Next reply from a worker; WorkerCrashed (and a replacement) if it exited"""
+        try:
+            return self.connections[worker].recv()
+        except (EOFError, OSError):
+            return self._crashed(worker)
+
+    def _request(self, worker, message):
+        if self.loop is not None:
+            raise RuntimeError("the pool is bound to an event loop; use process_async()")
+        self._send(worker, message)
+        result = self._receive(worker)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def process(self, session_id, input_text):
+        """Route one message to its session's worker and return (replies, continue_chat)"""
+        return self.process_batch([(session_id, input_text)])[0]
+
+    def process_batch(self, turns):
+        """(replies, continue_chat) for each (session_id, message), one round trip per worker
+
+        If any turn raised, the first such exception is raised once every reply
+        is in (the other turns have still been processed).
+        """
+        if self.loop is not None:
+            raise RuntimeError("the pool is bound to an event loop; use process_async()")
+        by_worker = {}
+        for i, (session_id, _) in enumerate(turns):
+            by_worker.setdefault(worker_for(session_id, self.workers), []).append(i)
+        # Send every batch before reading any reply so the workers run concurrently
+        for worker, indices in by_worker.items():
+            self._send(worker, ("turns", [turns[i] for i in indices]))
+        results = [None] * len(turns)
+        for worker, indices in by_worker.items():
+            replies = self._receive(worker)
+            if isinstance(replies, Exception):
+                replies = [replies] * len(indices)
+            for i, result in zip(indices, replies):
+                results[i] = result
+        self._track(turns, results)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def summary(self):
+        """Parent-side view of the pool (no round trip to the workers)"""
+        return {
+            "workers": self.workers,
+            "pids": [process.pid for process in self.processes],
+            "restarts": self.restarts,
+            "shared_bytes": self.shared.nbytes if self.shared is not None else 0
+        }
+
+    def stats(self):
+        workers = [self._request(worker, ("stats", None)) for worker in range(self.workers)]
+        return {
+            "workers": workers,
+            "shared_bytes": self.shared.nbytes if self.shared is not None else 0,
+            "parent_private_bytes": private_bytes()
+        }
+
+    # asyncio API
+
+    def bind(self, loop):
+        """Answer process_async() on this event loop (blocking calls are unavailable afterwards)"""
+        self.loop = loop
+        for worker, conn in enumerate(self.connections):
+            loop.add_reader(conn.fileno(), self._on_readable, worker)
+
+    def _on_readable(self, worker):
+        conn = self.connections[worker]
+        while True:
+            try:
+                if not conn.poll():
+                    break
+                result = conn.recv()
+            except (EOFError, OSError):
+                self._crashed(worker)
+                break
+            future = self.pending[worker].popleft()
+            if future.cancelled():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _submit(self, worker, message):
+        future = self.loop.create_future()
+        self._send(worker, message)
+        self.pending[worker].append(future)
+        return future
+
+    async def process_async(self, session_id, input_text):
+        replies = await self._submit(worker_for(session_id, self.workers), ("turns", [(session_id, input_text)]))
+        self._track([(session_id, input_text)], replies)
+        if isinstance(replies[0], Exception):
+            raise replies[0]
+        return replies[0]
+
+    def _track(self, turns, results):
+        for (session_id, _), result in zip(turns, results):
+            if isinstance(result, Exception):
+                continue
+            _, continue_chat = result
+            if continue_chat:
+                self.directory.get(session_id)
+            else:
+                self.directory.end(session_id)